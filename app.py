@@ -1,4 +1,4 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, request, jsonify, send_file, send_from_directory
 from flask_cors import CORS
 import uuid
 import threading
@@ -14,6 +14,11 @@ lock = threading.Lock()
 BASE_DIR = os.getcwd()
 OUTPUT_VIDEO = os.path.join(BASE_DIR, "final_video.mp4")
 OUTPUT_DOC = os.path.join(BASE_DIR, "project_documentation.docx")
+STREAM_DIR = os.path.join(BASE_DIR, "stream")
+OUTPUT_SUBTITLES = {
+    "vtt": os.path.join(BASE_DIR, "final_video.vtt"),
+    "srt": os.path.join(BASE_DIR, "final_video.srt")
+}
 
 
 # -------------------------------
@@ -33,6 +38,25 @@ def generate():
 
     query = f"{title} {description}".strip()
 
+    options = {
+        "image_backend": data.get("image_backend", "auto"),
+        "tts_backend": data.get("tts_backend", "edge"),
+        "profile": data.get("profile", "final"),
+        "subtitles": data.get("subtitles", "burn")
+    }
+
+    if options["image_backend"] not in ("auto", "remote", "local"):
+        return jsonify({"error": "Unknown image backend"}), 400
+
+    if options["tts_backend"] not in ("edge", "local", "tone"):
+        return jsonify({"error": "Unknown TTS backend"}), 400
+
+    if options["profile"] not in ("preview", "final", "720p", "1080p"):
+        return jsonify({"error": "Unknown profile"}), 400
+
+    if options["subtitles"] not in ("burn", "soft", "both"):
+        return jsonify({"error": "Unknown subtitle mode"}), 400
+
     job_id = str(uuid.uuid4())
 
     with lock:
@@ -41,12 +65,14 @@ def generate():
             "status": "Starting generation...",
             "progress": 5,
             "video": None,
-            "doc": None
+            "doc": None,
+            "subtitles": None,
+            "stream": None
         }
 
     thread = threading.Thread(
         target=run_job,
-        args=(job_id, query),
+        args=(job_id, query, options),
         daemon=True
     )
     thread.start()
@@ -58,10 +84,20 @@ def generate():
 # RUN PIPELINE
 # -------------------------------
 
-def run_job(job_id, query):
+def run_job(job_id, query, options):
+
+    command = [
+        "python", "-u", "backend/run_pipeline.py", query,
+        "--image-backend", options["image_backend"],
+        "--tts-backend", options["tts_backend"],
+        "--profile", options["profile"],
+        "--subtitles", options["subtitles"],
+        # The result page plays scenes while the rest render
+        "--stream"
+    ]
 
     process = subprocess.Popen(
-        ["python", "-u", "backend/run_pipeline.py", query],
+        command,
         stdout=subprocess.PIPE,
         stderr=subprocess.STDOUT,
         text=True
@@ -110,12 +146,24 @@ def run_job(job_id, query):
             elif "STAGE: VIDEO" in line:
                 update_job(job_id, "Rendering final video...", 90)
 
+            # First scene encoded: the HLS playlist can be played already
+            elif "STAGE: STREAM_READY" in line:
+
+                with lock:
+                    jobs[job_id]["stream"] = f"/api/stream/{job_id}/playlist.m3u8"
+
+                update_job(job_id, "Streaming while remaining scenes render...", 92)
+
             elif "STAGE: COMPLETE" in line:
 
                 with lock:
                     jobs[job_id]["video"] = f"/api/video/{job_id}"
                     jobs[job_id]["doc"] = f"/api/document/{job_id}"
 
+                    # Only soft / both subtitle modes write a sidecar track
+                    if os.path.exists(OUTPUT_SUBTITLES["vtt"]):
+                        jobs[job_id]["subtitles"] = f"/api/subtitles/{job_id}"
+
                 update_job(job_id, "Completed", 100)
 
         process.wait()
@@ -166,14 +214,18 @@ def status(job_id):
             "status": "Initializing...",
             "progress": 0,
             "video": None,
-            "doc": None
+            "doc": None,
+            "subtitles": None,
+            "stream": None
         })
 
     return jsonify({
         "status": job["status"],
         "progress": job["progress"],
         "video": job["video"],
-        "doc": job["doc"]
+        "doc": job["doc"],
+        "subtitles": job["subtitles"],
+        "stream": job["stream"]
     })
 
 
@@ -190,6 +242,59 @@ def video(job_id):
     return send_file(OUTPUT_VIDEO, mimetype="video/mp4")
 
 
+# -------------------------------
+# STREAM API (HLS)
+# -------------------------------
+
+STREAM_MIMETYPES = {
+    ".m3u8": "application/vnd.apple.mpegurl",
+    ".ts": "video/mp2t"
+}
+
+
+@app.route("/api/stream/<job_id>/<filename>")
+def stream(job_id, filename):
+
+    mimetype = STREAM_MIMETYPES.get(os.path.splitext(filename)[1])
+
+    if mimetype is None:
+        return jsonify({"error": "Unknown stream file"}), 404
+
+    if not os.path.exists(os.path.join(STREAM_DIR, filename)):
+        return jsonify({"error": "Stream not ready"}), 404
+
+    response = send_from_directory(STREAM_DIR, filename, mimetype=mimetype)
+
+    # The playlist grows while scenes render, so players must re-fetch it
+    if filename.endswith(".m3u8"):
+        response.headers["Cache-Control"] = "no-cache"
+
+    return response
+
+
+# -------------------------------
+# SUBTITLES API
+# -------------------------------
+
+@app.route("/api/subtitles/<job_id>")
+def subtitles(job_id):
+
+    # WebVTT for the <track> element, ?format=srt for download
+    fmt = request.args.get("format", "vtt")
+
+    if fmt not in OUTPUT_SUBTITLES:
+        return jsonify({"error": "Unknown subtitle format"}), 400
+
+    path = OUTPUT_SUBTITLES[fmt]
+
+    if not os.path.exists(path):
+        return jsonify({"error": "Subtitles not available"}), 404
+
+    mimetype = "text/vtt" if fmt == "vtt" else "application/x-subrip"
+
+    return send_file(path, mimetype=mimetype)
+
+
 # -------------------------------
 # DOCUMENT API
 # -------------------------------
@@ -1,6 +1,8 @@
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
 import os
 
+from render_resources import load_font
+
 # Folder where images are stored
 IMAGE_FOLDER = "images"
 
@@ -29,7 +31,7 @@ captions = [
 ]
 
 # Load font
-font = ImageFont.truetype("arial.ttf", 32)
+font = load_font(32)
 
 # Process each image
 for i, file in enumerate(sorted(os.listdir(IMAGE_FOLDER))):
@@ -0,0 +1,57 @@
+import os
+import re
+
+from file_cache import FileCache, make_key, link_or_copy
+
+
+# ==============================
+# SETTINGS
+# ==============================
+
+CACHE_FOLDER = os.path.join("cache", "audio")
+
+CACHE_MAX_MB = float(os.environ.get("AUDIO_CACHE_MAX_MB", "200"))
+
+
+# ==============================
+# TEXT NORMALIZATION
+# ==============================
+
+def normalize_text(text):
+
+    # Case and punctuation change prosody, so only whitespace is folded
+    return re.sub(r"\s+", " ", text).strip()
+
+
+# ==============================
+# AUDIO CACHE
+# ==============================
+
+class AudioCache:
+
+    def __init__(self, folder=CACHE_FOLDER, max_mb=CACHE_MAX_MB):
+        self.files = FileCache(folder, int(max_mb * 1024 * 1024))
+
+    def key_for(self, text, voice, rate, pitch, output_format):
+        return make_key(normalize_text(text), voice, rate, pitch, output_format)
+
+    def fetch(self, key, dest):
+
+        # Returns the stored metadata (duration, ...) or None on a miss
+        path = self.files.get(key)
+
+        if path is None:
+            return None
+
+        link_or_copy(path, dest)
+
+        return self.files.meta(key)
+
+    def store(self, key, audio_path, meta):
+
+        extension = os.path.splitext(audio_path)[1]
+
+        self.files.put(key, audio_path, meta, extension=extension)
+
+    def log_stats(self):
+        self.files.log_stats("Audio")
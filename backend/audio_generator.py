@@ -1,97 +1,395 @@
 import os
+import sys
+import json
+import time
 import asyncio
-import edge_tts
 
-print("=== Audio Generator (Edge TTS Version) ===")
+from pipeline_metrics import log_latency_summary
+from audio_cache import AudioCache
+from tts_backends import get_tts_backend
 
 data_file = "data/narration.txt"
 audio_folder = "audio"
 
-VOICE = "en-IN-PrabhatNeural"
+# Written scene by scene by generate_storyboard.py while the LLM is running
+stream_file = "data/narration_stream.jsonl"
 
-os.makedirs(audio_folder, exist_ok=True)
+# Give up following the stream when nothing new arrives for this long
+STREAM_IDLE_TIMEOUT = float(os.environ.get("TTS_STREAM_IDLE_TIMEOUT", "900"))
+STREAM_POLL_SECONDS = 0.25
+
+# Per-scene duration and word timings, read by the video stage
+MANIFEST_NAME = "manifest.json"
+
+# Number of scenes synthesized at the same time
+MAX_CONCURRENT = int(os.environ.get("TTS_MAX_CONCURRENT", "4"))
+
+# Send all scenes in one TTS request and split the result (edge backend)
+BATCH = os.environ.get("TTS_BATCH", "0") == "1"
 
 
 # ==============================
 # DELETE OLD AUDIO
 # ==============================
 
-for file in os.listdir(audio_folder):
-    if file.endswith(".mp3") or file.endswith(".wav"):
-        os.remove(os.path.join(audio_folder, file))
+def clear_old_audio(folder):
+
+    os.makedirs(folder, exist_ok=True)
+
+    for file in os.listdir(folder):
+        if file.endswith(".mp3") or file.endswith(".wav") or file == MANIFEST_NAME:
+            os.remove(os.path.join(folder, file))
 
 
 # ==============================
 # READ NARRATION FILE
 # ==============================
 
-with open(data_file, "r", encoding="utf-8") as f:
-    lines = f.readlines()
+def read_scenes(path):
+
+    with open(path, "r", encoding="utf-8") as f:
+        lines = f.readlines()
+
+    scenes = []
+    current = ""
+
+    for line in lines:
+
+        line = line.strip()
+
+        # Remove markdown symbols like **
+        line = line.replace("**", "").strip()
+
+        # Skip empty lines
+        if line == "":
+            continue
+
+        # Detect new scene
+        if line.lower().startswith("scene"):
+
+            if current != "":
+                scenes.append(current.strip())
+                current = ""
+
+        else:
+            current += " " + line
+
+    # add last scene
+    if current != "":
+        scenes.append(current.strip())
+
+    return scenes
+
+
+# ==============================
+# GENERATE AUDIO
+# ==============================
+
+def manifest_entry(index, text, filename, result):
+
+    return {
+        "index": index,
+        "file": os.path.basename(filename),
+        "text": text,
+        "duration": result["duration"],
+        "words": result.get("words", [])
+    }
+
+
+async def synthesize_scene(index, text, folder, semaphore, cache, backend):
+
+    filename = f"{folder}/{index}{backend.extension}"
+
+    key = None
+
+    if backend.cacheable:
+
+        key = cache.key_for(text, *backend.cache_params())
+        meta = cache.fetch(key, filename)
+
+        if meta is not None:
+            print(f"Reused from cache: {filename} ({meta['duration']:.2f}s audio)")
+            return None, manifest_entry(index, text, filename, meta)
+
+    async with semaphore:
+
+        print("Creating", filename)
+
+        started = time.monotonic()
+
+        result = await backend.synthesize(text, filename)
+
+        latency = time.monotonic() - started
+
+    if key is not None:
+        cache.store(key, filename, {
+            "duration": result["duration"],
+            "words": result.get("words", []),
+            "backend": backend.name
+        })
+
+    print(f"Saved {filename} ({latency:.2f}s, {result['duration']:.2f}s audio)")
+
+    return latency, manifest_entry(index, text, filename, result)
+
+
+# ==============================
+# WRITE MANIFEST
+# ==============================
+
+def write_manifest(folder, backend, entries):
+
+    path = os.path.join(folder, MANIFEST_NAME)
+    temp_path = path + ".tmp"
+
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump({"backend": backend.name, "scenes": entries}, f, indent=2)
+
+    os.replace(temp_path, path)
+
+    print("Saved:", path)
 
 
 # ==============================
-# SPLIT SCENES AND CLEAN TEXT
+# BATCHED SYNTHESIS
 # ==============================
 
-scenes = []
-current = ""
+async def synthesize_batched(scenes, folder, cache, backend):
+
+    results = [None] * len(scenes)
+    pending = []
+
+    for i, text in enumerate(scenes):
+
+        filename = f"{folder}/{i}{backend.extension}"
+        key = cache.key_for(text, *backend.batch_cache_params())
+        meta = cache.fetch(key, filename)
+
+        if meta is not None:
+            print(f"Reused from cache: {filename} ({meta['duration']:.2f}s audio)")
+            results[i] = (None, manifest_entry(i, text, filename, meta))
+        else:
+            pending.append((i, text, filename, key))
+
+    if not pending:
+        return results
+
+    print(f"Creating {len(pending)} scenes in one request")
+
+    started = time.monotonic()
+
+    batch = await backend.synthesize_batch(
+        [text for _, text, _, _ in pending],
+        [filename for _, _, filename, _ in pending]
+    )
+
+    latency = time.monotonic() - started
+
+    for number, ((i, text, filename, key), result) in enumerate(zip(pending, batch)):
+
+        cache.store(key, filename, {
+            "duration": result["duration"],
+            "words": result["words"],
+            "backend": backend.name
+        })
+
+        print(f"Saved {filename} ({result['duration']:.2f}s audio)")
+
+        # One request: its latency is one sample in the stage summary
+        results[i] = (latency if number == 0 else None, manifest_entry(i, text, filename, result))
+
+    print(f"Batched request took {latency:.2f}s")
 
-for line in lines:
+    return results
 
-    line = line.strip()
 
-    # Remove markdown symbols like **
-    line = line.replace("**", "").strip()
+async def generate_audio(scenes, folder=audio_folder, max_concurrent=MAX_CONCURRENT, backend=None, batch=BATCH):
 
-    # Skip empty lines
-    if line == "":
-        continue
+    semaphore = asyncio.Semaphore(max(1, max_concurrent))
+    cache = AudioCache()
+    backend = backend or get_tts_backend()
 
-    # Detect new scene
-    if line.lower().startswith("scene"):
+    print("TTS backend:", backend.name)
 
-        if current != "":
-            scenes.append(current.strip())
-            current = ""
+    stage_start = time.monotonic()
+
+    if batch and hasattr(backend, "synthesize_batch") and scenes:
+
+        results = await synthesize_batched(scenes, folder, cache, backend)
 
     else:
-        current += " " + line
 
+        # Output files are named by scene index, so finishing order is irrelevant
+        results = await asyncio.gather(*[
+            synthesize_scene(i, text, folder, semaphore, cache, backend)
+            for i, text in enumerate(scenes)
+        ])
+
+    write_manifest(folder, backend, [entry for _, entry in results])
+
+    print(f"Audio stage took {time.monotonic() - stage_start:.2f}s")
 
-# add last scene
-if current != "":
-    scenes.append(current.strip())
+    log_latency_summary("TTS scene", [l for l, _ in results if l is not None])
 
+    cache.log_stats()
 
-print("Scenes:", len(scenes))
+    print("All Audio Generated")
 
 
 # ==============================
-# GENERATE AUDIO USING EDGE TTS
+# FOLLOW STORYBOARD AS IT STREAMS
 # ==============================
 
-async def generate_audio():
+def clean_narration(text):
+    return text.replace("**", "").strip()
+
+
+def read_stream_records(path, position):
+
+    # Returns complete JSON lines written since position, and the new position
+    if not os.path.exists(path):
+        return [], position
+
+    with open(path, "rb") as f:
+        f.seek(position)
+        data = f.read()
+
+    end = data.rfind(b"\n") + 1
+
+    records = [
+        json.loads(line)
+        for line in data[:end].decode("utf-8").splitlines()
+        if line.strip()
+    ]
+
+    return records, position + end
+
+
+async def follow_narration(stream_path=stream_file, narration_path=data_file, folder=audio_folder,
+                           max_concurrent=MAX_CONCURRENT, backend=None):
+
+    semaphore = asyncio.Semaphore(max(1, max_concurrent))
+    cache = AudioCache()
+    backend = backend or get_tts_backend()
+
+    print("TTS backend:", backend.name, "(following storyboard)")
+
+    stage_start = time.monotonic()
+
+    # index -> (text, task); a newer text for the same scene waits for the older task
+    tasks = {}
+
+    async def replace_scene(index, text, previous):
+
+        if previous is not None:
+            await asyncio.gather(previous, return_exceptions=True)
+
+        return await synthesize_scene(index, text, folder, semaphore, cache, backend)
+
+    def schedule(index, text):
+
+        current = tasks.get(index)
+
+        if current is not None and current[0] == text:
+            return
+
+        previous = current[1] if current else None
+        tasks[index] = (text, asyncio.create_task(replace_scene(index, text, previous)))
+
+    position = 0
+    last_record = time.monotonic()
+    done = False
+
+    while not done:
+
+        records, position = read_stream_records(stream_path, position)
+
+        for record in records:
+
+            last_record = time.monotonic()
+
+            if record.get("done"):
+                done = True
+                break
+
+            print(f"Scene {record['scene']} narration received (attempt {record['attempt']})")
+
+            schedule(record["scene"] - 1, clean_narration(record["narration"]))
+
+        if done:
+            break
+
+        if time.monotonic() - last_record > STREAM_IDLE_TIMEOUT:
+            raise TimeoutError("Storyboard stopped publishing narration")
+
+        await asyncio.sleep(STREAM_POLL_SECONDS)
+
+    # narration.txt is authoritative: redo any scene that changed on retry
+    scenes = read_scenes(narration_path)
 
     for i, text in enumerate(scenes):
+        schedule(i, text)
 
-        filename = f"{audio_folder}/{i}.mp3"
+    for index in [i for i in tasks if i >= len(scenes)]:
 
-        print("Creating", filename)
+        _, task = tasks.pop(index)
+        await asyncio.gather(task, return_exceptions=True)
+
+        leftover = os.path.join(folder, f"{index}{backend.extension}")
 
-        communicate = edge_tts.Communicate(
-            text,
-            VOICE,
-            rate="-10%",
-            pitch="+0Hz"
-        )
+        if os.path.exists(leftover):
+            os.remove(leftover)
 
-        await communicate.save(filename)
+    results = await asyncio.gather(*[tasks[i][1] for i in range(len(scenes))])
+
+    write_manifest(folder, backend, [entry for _, entry in results])
+
+    print(f"Audio stage took {time.monotonic() - stage_start:.2f}s")
+
+    log_latency_summary("TTS scene", [l for l, _ in results if l is not None])
+
+    cache.log_stats()
 
     print("All Audio Generated")
 
 
+# ==============================
+# STAGE ENTRY POINT
+# ==============================
+
+def run(narration_path=data_file, folder=audio_folder, max_concurrent=MAX_CONCURRENT, backend_name=None):
+
+    clear_old_audio(folder)
+
+    scenes = read_scenes(narration_path)
+
+    print("Scenes:", len(scenes))
+
+    backend = get_tts_backend(backend_name)
+
+    asyncio.run(generate_audio(scenes, folder, max_concurrent, backend))
+
+
+def run_following(stream_path=stream_file, narration_path=data_file, folder=audio_folder,
+                  max_concurrent=MAX_CONCURRENT, backend_name=None):
+
+    clear_old_audio(folder)
+
+    backend = get_tts_backend(backend_name)
+
+    asyncio.run(follow_narration(stream_path, narration_path, folder, max_concurrent, backend))
+
+
 # ==============================
 # RUN
 # ==============================
 
-asyncio.run(generate_audio())
\ No newline at end of file
+if __name__ == "__main__":
+
+    print("=== Audio Generator ===")
+
+    # --follow starts synthesizing while the storyboard is still being written
+    if "--follow" in sys.argv[1:]:
+        run_following()
+    else:
+        run()
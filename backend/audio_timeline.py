@@ -0,0 +1,93 @@
+import os
+import subprocess
+
+import numpy as np
+
+from render_resources import find_ffmpeg
+
+
+# ==============================
+# SETTINGS
+# ==============================
+
+# The whole soundtrack is held as 16-bit PCM at the output rate (192 KB/s)
+SAMPLE_RATE = 48000
+CHANNELS = 2
+
+
+def pcm_input_args():
+
+    # Raw samples piped to ffmpeg's stdin, one AAC encode for the whole video
+    return [
+        "-f", "s16le",
+        "-ar", str(SAMPLE_RATE),
+        "-ac", str(CHANNELS),
+        "-i", "pipe:0"
+    ]
+
+
+# ==============================
+# DECODE ONE NARRATION FILE
+# ==============================
+
+def decode_audio(path):
+
+    # mp3 or wav straight to interleaved samples, no intermediate file
+    result = subprocess.run(
+        [
+            find_ffmpeg(), "-hide_banner", "-loglevel", "error",
+            "-i", path,
+            "-f", "s16le",
+            "-ar", str(SAMPLE_RATE),
+            "-ac", str(CHANNELS),
+            "pipe:1"
+        ],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE
+    )
+
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg could not decode {path}: {result.stderr.decode(errors='ignore').strip()}")
+
+    return np.frombuffer(result.stdout, dtype=np.int16).reshape(-1, CHANNELS)
+
+
+# ==============================
+# ASSEMBLE THE TIMELINE
+# ==============================
+
+def build_audio_timeline(timeline, audio_folder, fps):
+
+    # Scenes sit on the video frame grid, so audio and video share every
+    # boundary and no offset can build up from scene to scene
+    samples_per_frame = SAMPLE_RATE // fps
+
+    total_frames = sum(scene["frames"] for scene in timeline)
+
+    # Image-only scenes and short narration stay as zeros (silence)
+    samples = np.zeros((total_frames * samples_per_frame, CHANNELS), dtype=np.int16)
+
+    for scene in timeline:
+
+        if not scene["audio"]:
+            continue
+
+        first = scene["first_frame"] * samples_per_frame
+        length = scene["frames"] * samples_per_frame
+
+        narration = decode_audio(os.path.join(audio_folder, scene["audio"]))[:length]
+
+        samples[first:first + len(narration)] = narration
+
+    print(f"Assembled audio timeline: {len(samples) / SAMPLE_RATE:.2f}s")
+
+    return samples
+
+
+def timeline_slice(samples, first_frame, frames, fps):
+
+    samples_per_frame = SAMPLE_RATE // fps
+
+    first = first_frame * samples_per_frame
+
+    return samples[first:first + frames * samples_per_frame]
@@ -0,0 +1,98 @@
+import os
+import sys
+import time
+import tempfile
+
+from diagram_generator import (
+    INPUT_FILE,
+    architecture_diagram,
+    dataflow_diagram,
+    extract_modules,
+    extract_technologies,
+    extract_workflow,
+    technology_diagram,
+    workflow_diagram
+)
+from diagram_renderers import GraphvizDiagramRenderer, PillowDiagramRenderer
+from pipeline_metrics import log_latency_summary, percentile
+from render_profiles import get_output_size
+
+
+# Usage: python backend/benchmark_diagrams.py [rounds]
+ROUNDS = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+SAMPLE_TEXT = """
+The system has a React frontend and a Flask backend with a PostgreSQL database.
+Sensor data is collected, passed through preprocessing and fed to a machine learning model.
+1. Collect sensor readings
+2. Clean and preprocess the data
+3. Train the prediction model
+4. Serve predictions through the REST API
+5. Show results on the dashboard
+Deployment uses Docker and Kubernetes on AWS, with monitoring and logging.
+"""
+
+
+def build_specs():
+
+    if os.path.exists(INPUT_FILE):
+        with open(INPUT_FILE, "r", encoding="utf-8") as f:
+            text = f.read()
+    else:
+        text = SAMPLE_TEXT
+
+    modules = extract_modules(text)
+
+    return [
+        ("architecture", architecture_diagram(modules)),
+        ("workflow", workflow_diagram(extract_workflow(text))),
+        ("technology", technology_diagram(extract_technologies(text))),
+        ("dataflow", dataflow_diagram(modules))
+    ]
+
+
+def benchmark(renderer, specs, size, folder):
+
+    timings = []
+    sizes = []
+
+    for round_number in range(ROUNDS):
+        for name, spec in specs:
+
+            path = os.path.join(folder, f"{renderer.name}_{name}_{round_number}.png")
+
+            started = time.monotonic()
+            renderer.render(spec, path, size)
+            timings.append(time.monotonic() - started)
+
+            sizes.append(os.path.getsize(path))
+
+    log_latency_summary(f"{renderer.name} diagram", timings)
+
+    print(
+        f"{renderer.name}: total={sum(timings):.2f}s "
+        f"p50={percentile(timings, 50) * 1000:.0f}ms "
+        f"avg_png={sum(sizes) / len(sizes) / 1024:.0f}KB"
+    )
+
+
+def main():
+
+    size = get_output_size()
+    specs = build_specs()
+
+    print(f"Rendering {len(specs)} diagrams x {ROUNDS} rounds at {size[0]}x{size[1]}")
+
+    with tempfile.TemporaryDirectory() as folder:
+
+        for renderer in (GraphvizDiagramRenderer(), PillowDiagramRenderer()):
+
+            if not renderer.is_available():
+                print(f"{renderer.name}: not available, skipped")
+                continue
+
+            benchmark(renderer, specs, size, folder)
+
+
+if __name__ == "__main__":
+    main()
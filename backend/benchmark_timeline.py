@@ -0,0 +1,148 @@
+import os
+import sys
+import subprocess
+import tempfile
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from render_resources import use_ffmpeg
+
+use_ffmpeg()
+
+from moviepy.editor import ImageClip, CompositeVideoClip, concatenate_videoclips
+
+from pipeline_metrics import resource
+from render_profiles import get_output_size
+from scene_timeline import LazySceneTimeline
+from still_renderer import FPS, composite_still
+
+
+# Usage: python backend/benchmark_timeline.py [scene counts...]
+DEFAULT_SCENE_COUNTS = [5, 10, 20, 40]
+
+# Size of the graphviz diagrams before render-time resizing was removed
+IMAGE_SIZE = (4800, 2700)
+
+SCENE_SECONDS = 1
+
+# Distinct images on disk, reused round-robin across scenes
+IMAGE_COUNT = 4
+
+MODES = ("eager", "lazy")
+
+
+def image_path(folder, i):
+    return os.path.join(folder, f"scene_{i % IMAGE_COUNT}.png")
+
+
+def make_images(folder):
+
+    for i in range(IMAGE_COUNT):
+
+        img = Image.new("RGB", IMAGE_SIZE, (40 * i, 90, 160))
+        draw = ImageDraw.Draw(img)
+        draw.ellipse((600, 400, 4200, 2300), fill=(173, 216, 230), outline=(0, 0, 0), width=12)
+
+        img.save(image_path(folder, i), compress_level=1)
+
+
+def make_timeline(count):
+
+    frames = SCENE_SECONDS * FPS
+
+    return [{"first_frame": i * frames, "frames": frames} for i in range(count)]
+
+
+def eager_frames(paths, timeline, size):
+
+    # Previous construction: every scene's clip built up front (without
+    # the render-time resize, which moviepy 1.0 cannot do on Pillow 10)
+    clips = []
+
+    for path, scene in zip(paths, timeline):
+        image_clip = ImageClip(path).set_duration(scene["frames"] / FPS)
+        clips.append(CompositeVideoClip([image_clip], size=size))
+
+    video = concatenate_videoclips(clips, method="compose")
+
+    for scene in timeline:
+        video.get_frame((scene["first_frame"] + 0.5) / FPS)
+
+
+def lazy_frames(paths, timeline, size):
+
+    scenes = LazySceneTimeline(
+        timeline, FPS,
+        lambda i: np.asarray(composite_still(paths[i], None, 0, size))
+    )
+
+    video = scenes.clip()
+
+    for scene in timeline:
+        video.get_frame((scene["first_frame"] + 0.5) / FPS)
+
+    scenes.close()
+
+
+def worker(mode, count, folder):
+
+    # Runs in its own process so ru_maxrss is this mode and count alone
+    size = get_output_size()
+    paths = [image_path(folder, i) for i in range(count)]
+    timeline = make_timeline(count)
+
+    if mode == "eager":
+        eager_frames(paths, timeline, size)
+    else:
+        lazy_frames(paths, timeline, size)
+
+    print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024)
+
+
+def measure(mode, count, folder):
+
+    result = subprocess.run(
+        [sys.executable, __file__, "--worker", mode, str(count), folder],
+        capture_output=True,
+        text=True
+    )
+
+    if result.returncode != 0:
+        return None
+
+    return int(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+
+    counts = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SCENE_COUNTS
+
+    if resource is None:
+        print("Peak RSS needs the resource module (not available on Windows)")
+        return
+
+    print(f"Peak RSS for {IMAGE_SIZE[0]}x{IMAGE_SIZE[1]} scene images")
+    print(f"{'scenes':>8} " + " ".join(f"{mode:>10}" for mode in MODES))
+
+    with tempfile.TemporaryDirectory() as folder:
+
+        make_images(folder)
+
+        for count in counts:
+
+            cells = []
+
+            for mode in MODES:
+                peak = measure(mode, count, folder)
+                cells.append(f"{peak:>8}MB" if peak is not None else f"{'failed':>10}")
+
+            print(f"{count:>8} " + " ".join(cells))
+
+
+if __name__ == "__main__":
+
+    if len(sys.argv) == 5 and sys.argv[1] == "--worker":
+        worker(sys.argv[2], int(sys.argv[3]), sys.argv[4])
+    else:
+        main()
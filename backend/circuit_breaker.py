@@ -0,0 +1,108 @@
+import time
+import random
+import threading
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+# ==============================
+# CIRCUIT BREAKER
+# ==============================
+
+class CircuitBreaker:
+
+    def __init__(self, threshold, cooldown):
+
+        self.threshold = threshold
+        self.cooldown = cooldown
+
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+
+        self.lock = threading.Lock()
+
+    def allow(self):
+
+        with self.lock:
+
+            if self.opened_at is None:
+                return True
+
+            # Half-open: let a single trial request through after cooldown
+            if time.monotonic() - self.opened_at >= self.cooldown and not self.trial_running:
+                self.trial_running = True
+                return True
+
+            return False
+
+    def success(self):
+
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_running = False
+
+    def failure(self):
+
+        with self.lock:
+
+            self.failures += 1
+            self.trial_running = False
+
+            if self.failures >= self.threshold:
+
+                if self.opened_at is None:
+                    print(f"Circuit opened after {self.failures} consecutive failures")
+
+                self.opened_at = time.monotonic()
+
+    @property
+    def is_open(self):
+        return self.opened_at is not None
+
+
+# ==============================
+# RETRY WITH EXPONENTIAL BACKOFF
+# ==============================
+
+def call_with_retry(func, breaker, retries, backoff, deadline, retry_on):
+
+    # func receives the seconds left before the overall deadline
+    attempt = 0
+
+    while True:
+
+        remaining = deadline - time.monotonic()
+
+        if remaining <= 0:
+            raise TimeoutError("Stage deadline reached")
+
+        if not breaker.allow():
+            raise CircuitOpenError("Endpoint marked as down, not retrying")
+
+        try:
+            result = func(remaining)
+        except retry_on as e:
+
+            breaker.failure()
+
+            if attempt >= retries:
+                raise
+
+            delay = backoff * (2 ** attempt) * (0.5 + random.random() / 2)
+            delay = min(delay, max(0.0, deadline - time.monotonic()))
+
+            attempt += 1
+
+            print(f"Attempt {attempt} failed ({e}), retrying in {delay:.1f}s")
+
+            time.sleep(delay)
+
+            continue
+
+        breaker.success()
+
+        return result
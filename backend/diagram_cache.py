@@ -0,0 +1,37 @@
+import os
+
+from file_cache import FileCache, make_key
+
+
+# ==============================
+# SETTINGS
+# ==============================
+
+CACHE_FOLDER = os.path.join("cache", "diagrams")
+
+CACHE_MAX_MB = float(os.environ.get("DIAGRAM_CACHE_MAX_MB", "100"))
+
+
+# ==============================
+# DIAGRAM CACHE
+# ==============================
+
+class DiagramCache:
+
+    def __init__(self, folder=CACHE_FOLDER, max_mb=CACHE_MAX_MB):
+        self.files = FileCache(folder, int(max_mb * 1024 * 1024), extension=".png")
+
+    def key_for(self, spec, size, renderer):
+
+        # The spec fully determines the DOT source, so identical module and
+        # tech lists map to the same entry
+        return make_key(spec, list(size), renderer.name, renderer.version)
+
+    def fetch(self, key, dest):
+        return self.files.copy_to(key, dest)
+
+    def store(self, key, path, renderer):
+        self.files.put(key, path, {"renderer": renderer.name})
+
+    def log_stats(self):
+        self.files.log_stats("Diagram")
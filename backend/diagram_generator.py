@@ -1,26 +1,64 @@
 import os
 import re
-import spacy
-from graphviz import Digraph
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-nlp = spacy.load("en_core_web_sm")
+from diagram_cache import DiagramCache
+from diagram_renderers import add_edge, add_node, make_spec, select_diagram_renderer
+from keyword_matcher import KeywordMatcher
+from render_profiles import get_output_size
 
 INPUT_FILE = "rag_output.txt"
 OUTPUT_FOLDER = "images"
 
+# Written by image_generator: which image slots the scenes own
+MANIFEST_FILE = os.path.join(OUTPUT_FOLDER, "manifest.json")
+
+# Slot used for the first diagram when no scene information exists
+DEFAULT_FIRST_SLOT = 11
+
+# spaCy entity extraction on top of keyword matching (slow to load)
+NLP_ENABLED = os.environ.get("DIAGRAM_NLP", "0") == "1"
+
+_nlp = None
+
+
+def get_nlp():
+
+    global _nlp
+
+    if _nlp is None:
+        import spacy
+        _nlp = spacy.load("en_core_web_sm")
+
+    return _nlp
+
 os.makedirs(OUTPUT_FOLDER, exist_ok=True)
 
 
 # ---------------------------
-# Get next image number
+# Assign image slots up front
 # ---------------------------
-def get_next_image_number():
+def load_manifest():
+
+    if not os.path.exists(MANIFEST_FILE):
+        return None
+
+    with open(MANIFEST_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
 
-    files = os.listdir(OUTPUT_FOLDER)
+def first_free_slot(manifest):
 
+    # Scenes own image_1 .. image_N, diagrams follow right after
+    if manifest is not None:
+        return len(manifest["scenes"]) + 1
+
+    # Older runs without a manifest: scan the folder once
     numbers = []
 
-    for f in files:
+    for f in os.listdir(OUTPUT_FOLDER):
         match = re.match(r"image_(\d+)\.png", f)
         if match:
             numbers.append(int(match.group(1)))
@@ -28,7 +66,22 @@ def get_next_image_number():
     if numbers:
         return max(numbers) + 1
     else:
-        return 11
+        return DEFAULT_FIRST_SLOT
+
+
+def record_diagrams(manifest, diagrams):
+
+    if manifest is None:
+        return
+
+    manifest["diagrams"] = diagrams
+
+    temp_path = MANIFEST_FILE + ".tmp"
+
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    os.replace(temp_path, MANIFEST_FILE)
 
 
 # ---------------------------
@@ -46,107 +99,111 @@ def extract_workflow(text):
 
 
 # ---------------------------
-# Extract technologies
+# Keyword tables
 # ---------------------------
-def extract_technologies(text):
+TECH_KEYWORDS = [
 
-    tech_keywords = [
+    "python","java","c++","c","javascript","typescript","go","rust","kotlin","swift",
 
-        "python","java","c++","c","javascript","typescript","go","rust","kotlin","swift",
+    "tensorflow","pytorch","keras","scikit-learn","opencv","huggingface","langchain",
 
-        "tensorflow","pytorch","keras","scikit-learn","opencv","huggingface","langchain",
+    "pandas","numpy","matplotlib","seaborn",
 
-        "pandas","numpy","matplotlib","seaborn",
+    "react","angular","vue","html","css","bootstrap",
 
-        "react","angular","vue","html","css","bootstrap",
+    "flask","django","fastapi","node","express","spring","springboot",
 
-        "flask","django","fastapi","node","express","spring","springboot",
+    "react native","flutter","android","ios",
 
-        "react native","flutter","android","ios",
+    "mysql","postgresql","mongodb","sqlite","oracle","redis","cassandra",
 
-        "mysql","postgresql","mongodb","sqlite","oracle","redis","cassandra",
+    "hadoop","spark","pyspark","kafka","hive",
 
-        "hadoop","spark","pyspark","kafka","hive",
+    "aws","azure","gcp","google cloud","firebase",
 
-        "aws","azure","gcp","google cloud","firebase",
+    "docker","kubernetes","jenkins","github actions","gitlab",
 
-        "docker","kubernetes","jenkins","github actions","gitlab",
+    "rest api","graphql","api gateway",
 
-        "rest api","graphql","api gateway",
+    "tableau","power bi","plotly",
 
-        "tableau","power bi","plotly",
+    "blockchain","cybersecurity","encryption","oauth","jwt"
+]
 
-        "blockchain","cybersecurity","encryption","oauth","jwt"
-    ]
+MODULE_KEYWORDS = {
 
-    found = []
-    lower = text.lower()
+    "frontend": "Frontend Interface",
+    "backend": "Backend Server",
+    "server": "Application Server",
+    "client": "Client Interface",
 
-    for tech in tech_keywords:
-        if tech in lower:
-            found.append(tech.title())
+    "ai": "AI Engine",
+    "machine learning": "ML Model",
+    "deep learning": "Deep Learning Module",
+    "neural network": "Neural Network Engine",
 
-    return list(set(found))
+    "data": "Data Processing Module",
+    "analytics": "Analytics Module",
+    "preprocessing": "Data Preprocessing Module",
+    "visualization": "Visualization Module",
 
+    "database": "Database System",
+    "storage": "Data Storage Module",
+    "warehouse": "Data Warehouse",
 
-# ---------------------------
-# Extract modules
-# ---------------------------
-def extract_modules(text):
+    "api": "API Gateway",
+    "integration": "Integration Layer",
 
-    module_keywords = {
+    "security": "Security Module",
+    "authentication": "Authentication Module",
+    "authorization": "Access Control Module",
+    "encryption": "Encryption Module",
 
-        "frontend": "Frontend Interface",
-        "backend": "Backend Server",
-        "server": "Application Server",
-        "client": "Client Interface",
+    "cloud": "Cloud Infrastructure",
+    "deployment": "Deployment Module",
+    "container": "Container Management",
 
-        "ai": "AI Engine",
-        "machine learning": "ML Model",
-        "deep learning": "Deep Learning Module",
-        "neural network": "Neural Network Engine",
+    "monitoring": "Monitoring System",
+    "logging": "Logging Module",
 
-        "data": "Data Processing Module",
-        "analytics": "Analytics Module",
-        "preprocessing": "Data Preprocessing Module",
-        "visualization": "Visualization Module",
+    "sensor": "Sensor Network",
+    "iot": "IoT Module",
 
-        "database": "Database System",
-        "storage": "Data Storage Module",
-        "warehouse": "Data Warehouse",
+    "user": "User Interface",
+    "dashboard": "Dashboard Module",
 
-        "api": "API Gateway",
-        "integration": "Integration Layer",
+    "report": "Reporting Module",
 
-        "security": "Security Module",
-        "authentication": "Authentication Module",
-        "authorization": "Access Control Module",
-        "encryption": "Encryption Module",
+    "recommendation": "Recommendation Engine"
+}
 
-        "cloud": "Cloud Infrastructure",
-        "deployment": "Deployment Module",
-        "container": "Container Management",
+# Compiled once; each text is scanned in a single pass
+TECH_MATCHER = KeywordMatcher(TECH_KEYWORDS)
+MODULE_MATCHER = KeywordMatcher(MODULE_KEYWORDS, plurals=True)
 
-        "monitoring": "Monitoring System",
-        "logging": "Logging Module",
 
-        "sensor": "Sensor Network",
-        "iot": "IoT Module",
+# ---------------------------
+# Extract technologies
+# ---------------------------
+def extract_technologies(text):
 
-        "user": "User Interface",
-        "dashboard": "Dashboard Module",
+    found = [tech.title() for tech in TECH_MATCHER.present(text)]
 
-        "report": "Reporting Module",
+    if NLP_ENABLED:
+        doc = get_nlp()(text)
+        found += [ent.text for ent in doc.ents if ent.label_ in ("ORG", "PRODUCT")]
 
-        "recommendation": "Recommendation Engine"
-    }
+    # Keywords in declaration order, then entities in text order: dedupe
+    # without a set so the same text always yields the same diagram
+    return list(dict.fromkeys(found))
 
-    modules = []
-    lower = text.lower()
 
-    for key, module in module_keywords.items():
-        if key in lower:
-            modules.append(module)
+# ---------------------------
+# Extract modules
+# ---------------------------
+def extract_modules(text):
+
+    modules = [MODULE_KEYWORDS[key] for key in MODULE_MATCHER.present(text)]
 
     if not modules:
         modules = [
@@ -160,44 +217,31 @@ def extract_modules(text):
 
 
 # ---------------------------
-# Diagram Style Settings
+# Save diagram helper
 # ---------------------------
-def apply_style(dot):
-
-    dot.attr(
-        size="16,9!",
-        dpi="300",
-        ranksep="1.2",
-        nodesep="0.8"
-    )
-
-    dot.attr(
-        'node',
-        shape='ellipse',
-        fontsize='22',
-        width='2.5',
-        height='1.2',
-        style='filled',
-        fillcolor='lightblue'
-    )
-
-    dot.attr(
-        'edge',
-        fontsize='18'
-    )
+def save_diagram(renderer, spec, img_num, cache):
 
+    started = time.monotonic()
 
-# ---------------------------
-# Save diagram helper
-# ---------------------------
-def save_diagram(dot):
+    filename = f"{OUTPUT_FOLDER}/image_{img_num}.png"
+    size = get_output_size()
+
+    key = cache.key_for(spec, size, renderer)
+
+    if cache.fetch(key, filename):
+        elapsed = time.monotonic() - started
+        print(f"Reused from cache: image_{img_num}.png ({elapsed:.2f}s)")
+        return elapsed
+
+    renderer.render(spec, filename, size)
 
-    img_num = get_next_image_number()
-    filename = f"{OUTPUT_FOLDER}/image_{img_num}"
+    cache.store(key, filename, renderer)
 
-    dot.render(filename, format="png", cleanup=True)
+    elapsed = time.monotonic() - started
 
-    print(f"Generated image_{img_num}.png")
+    print(f"Generated image_{img_num}.png ({elapsed:.2f}s)")
+
+    return elapsed
 
 
 # ---------------------------
@@ -205,24 +249,21 @@ def save_diagram(dot):
 # ---------------------------
 def architecture_diagram(modules):
 
-    dot = Digraph()
-    dot.attr(rankdir="LR")
-
-    apply_style(dot)
+    spec = make_spec("chain", rankdir="LR")
 
-    dot.node("User")
+    add_node(spec, "User")
     prev = "User"
 
     for i, module in enumerate(modules):
         node = f"M{i}"
-        dot.node(node, module)
-        dot.edge(prev, node)
+        add_node(spec, node, module)
+        add_edge(spec, prev, node)
         prev = node
 
-    dot.node("Output")
-    dot.edge(prev, "Output")
+    add_node(spec, "Output")
+    add_edge(spec, prev, "Output")
 
-    save_diagram(dot)
+    return spec
 
 
 # ---------------------------
@@ -230,23 +271,21 @@ def architecture_diagram(modules):
 # ---------------------------
 def workflow_diagram(steps):
 
-    dot = Digraph()
+    spec = make_spec("chain")
 
-    apply_style(dot)
-
-    dot.node("Start")
+    add_node(spec, "Start")
     prev = "Start"
 
     for i, step in enumerate(steps):
         node = f"S{i}"
-        dot.node(node, step)
-        dot.edge(prev, node)
+        add_node(spec, node, step)
+        add_edge(spec, prev, node)
         prev = node
 
-    dot.node("End")
-    dot.edge(prev, "End")
+    add_node(spec, "End")
+    add_edge(spec, prev, "End")
 
-    save_diagram(dot)
+    return spec
 
 
 # ---------------------------
@@ -254,18 +293,16 @@ def workflow_diagram(steps):
 # ---------------------------
 def technology_diagram(techs):
 
-    dot = Digraph()
-
-    apply_style(dot)
+    spec = make_spec("star")
 
-    dot.node("System")
+    add_node(spec, "System")
 
     for i, tech in enumerate(techs):
         node = f"T{i}"
-        dot.node(node, tech)
-        dot.edge("System", node)
+        add_node(spec, node, tech)
+        add_edge(spec, "System", node)
 
-    save_diagram(dot)
+    return spec
 
 
 # ---------------------------
@@ -273,17 +310,14 @@ def technology_diagram(techs):
 # ---------------------------
 def dataflow_diagram(modules):
 
-    dot = Digraph()
-    dot.attr(rankdir="LR")
-
-    apply_style(dot)
+    spec = make_spec("chain", rankdir="LR")
 
     for i in range(len(modules)-1):
-        dot.node(modules[i])
-        dot.node(modules[i+1])
-        dot.edge(modules[i], modules[i+1])
+        add_node(spec, modules[i])
+        add_node(spec, modules[i+1])
+        add_edge(spec, modules[i], modules[i+1])
 
-    save_diagram(dot)
+    return spec
 
 
 # ---------------------------
@@ -298,15 +332,52 @@ def main():
     with open(INPUT_FILE, "r", encoding="utf-8") as f:
         text = f.read()
 
+    renderer = select_diagram_renderer()
+
+    print("Diagram renderer:", renderer.name)
+
+    cache = DiagramCache()
+
     modules = extract_modules(text)
     steps = extract_workflow(text)
     techs = extract_technologies(text)
 
-    architecture_diagram(modules)
-    workflow_diagram(steps)
-    technology_diagram(techs)
-    dataflow_diagram(modules)
+    diagrams = [
+        ("architecture", architecture_diagram(modules)),
+        ("workflow", workflow_diagram(steps)),
+        ("technology", technology_diagram(techs)),
+        ("dataflow", dataflow_diagram(modules))
+    ]
+
+    # Slots are fixed before rendering, so parallel renders cannot collide
+    manifest = load_manifest()
+    first_slot = first_free_slot(manifest)
+
+    started = time.monotonic()
+
+    # dot renders are separate processes; PIL releases the GIL while
+    # resampling and encoding, so threads help either way
+    with ThreadPoolExecutor(max_workers=len(diagrams)) as pool:
+
+        futures = [
+            pool.submit(save_diagram, renderer, spec, first_slot + i, cache)
+            for i, (_, spec) in enumerate(diagrams)
+        ]
+
+        timings = [future.result() for future in futures]
+
+    for (name, _), elapsed in zip(diagrams, timings):
+        print(f"{name} diagram render: {elapsed:.2f}s")
+
+    print(f"All diagrams rendered in {time.monotonic() - started:.2f}s")
+
+    cache.log_stats()
+
+    record_diagrams(manifest, [
+        {"name": name, "file": f"image_{first_slot + i}.png"}
+        for i, (name, _) in enumerate(diagrams)
+    ])
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,341 @@
+import os
+import math
+import shutil
+import importlib.util
+
+from PIL import Image, ImageDraw
+
+from image_ingest import normalize_image
+from render_resources import load_font, wrap_text
+
+
+# ==============================
+# DIAGRAM SPEC
+# ==============================
+
+# Diagrams are plain dicts so any renderer can draw them:
+#   {"layout": "chain" | "star", "rankdir": "TB" | "LR",
+#    "nodes": [(id, label)], "edges": [(from_id, to_id)]}
+
+def make_spec(layout, rankdir="TB"):
+    return {"layout": layout, "rankdir": rankdir, "nodes": [], "edges": []}
+
+
+def add_node(spec, node_id, label=None):
+
+    if all(existing != node_id for existing, _ in spec["nodes"]):
+        spec["nodes"].append((node_id, label or node_id))
+
+
+def add_edge(spec, start, end):
+    spec["edges"].append((start, end))
+
+
+# ==============================
+# GRAPHVIZ (EXTERNAL DOT PROCESS)
+# ==============================
+
+class GraphvizDiagramRenderer:
+
+    name = "graphviz"
+    version = 1
+
+    def is_available(self):
+        return importlib.util.find_spec("graphviz") is not None and shutil.which("dot") is not None
+
+    def to_dot(self, spec, size):
+
+        from graphviz import Digraph
+
+        width, height = size
+
+        dot = Digraph()
+        dot.attr(rankdir=spec["rankdir"])
+
+        # 16x9 inch canvas at height/9 dpi lands on the profile's pixel size,
+        # instead of a 4800x2700 render that is shrunk afterwards
+        dot.attr(
+            size="16,9!",
+            dpi=f"{height / 9:.2f}",
+            ranksep="1.2",
+            nodesep="0.8"
+        )
+
+        dot.attr(
+            'node',
+            shape='ellipse',
+            fontsize='22',
+            width='2.5',
+            height='1.2',
+            style='filled',
+            fillcolor='lightblue'
+        )
+
+        dot.attr(
+            'edge',
+            fontsize='18'
+        )
+
+        for node_id, label in spec["nodes"]:
+            dot.node(node_id, label)
+
+        for start, end in spec["edges"]:
+            dot.edge(start, end)
+
+        return dot
+
+    def render(self, spec, path, size):
+
+        # path may be a hard link into the diagram cache: dot writes a
+        # temporary file and the result is swapped in, never written in place
+        base = path + ".dot"
+
+        self.to_dot(spec, size).render(base, format="png", cleanup=True)
+
+        # Letterbox to the exact frame size (aspect ratio may differ slightly);
+        # normalize_image writes its own temp file and os.replaces path
+        normalize_image(base + ".png", path, size)
+
+        os.remove(base + ".png")
+
+
+# ==============================
+# PILLOW (IN PROCESS)
+# ==============================
+
+FILL = (173, 216, 230)      # graphviz "lightblue"
+OUTLINE = (0, 0, 0)
+BACKGROUND = (255, 255, 255)
+
+# Long chains wrap onto further rows (LR) or columns (TB)
+MAX_PER_LINE = 5
+
+# Drawn at this multiple of the output size, then downsampled for smooth edges
+SUPERSAMPLE = 2
+
+
+class PillowDiagramRenderer:
+
+    name = "pil"
+    version = 1
+
+    def is_available(self):
+        return True
+
+    def font(self, size):
+        return load_font(size)
+
+    # ------------------------------
+    # Layout: node id -> (cx, cy, rx, ry)
+    # ------------------------------
+
+    def layout_chain(self, spec, width, height):
+
+        nodes = [node_id for node_id, _ in spec["nodes"]]
+        count = len(nodes)
+
+        per_line = min(count, MAX_PER_LINE) or 1
+        lines = math.ceil(count / per_line)
+
+        horizontal = spec["rankdir"] == "LR"
+
+        cols, rows = (per_line, lines) if horizontal else (lines, per_line)
+
+        margin = height * 0.06
+        cell_w = (width - 2 * margin) / cols
+        cell_h = (height - 2 * margin) / rows
+
+        rx = min(cell_w * 0.42, cell_h * 1.1)
+        ry = min(cell_h * 0.34, rx * 0.55)
+
+        positions = {}
+
+        for i, node_id in enumerate(nodes):
+
+            line, step = divmod(i, per_line)
+
+            # Snake back on alternate lines so consecutive nodes stay adjacent
+            if line % 2 == 1:
+                step = per_line - 1 - step
+
+            col, row = (step, line) if horizontal else (line, step)
+
+            positions[node_id] = (
+                margin + (col + 0.5) * cell_w,
+                margin + (row + 0.5) * cell_h,
+                rx,
+                ry
+            )
+
+        return positions
+
+    def layout_star(self, spec, width, height):
+
+        (center, _), *leaves = spec["nodes"]
+
+        cx, cy = width / 2, height / 2
+
+        positions = {center: (cx, cy, width * 0.09, height * 0.08)}
+
+        if not leaves:
+            return positions
+
+        orbit_x, orbit_y = width * 0.37, height * 0.36
+
+        # Leaves share the orbit evenly, starting straight above the center
+        spacing = 2 * math.pi * min(orbit_x, orbit_y) / len(leaves)
+        rx = min(width * 0.08, spacing * 0.7)
+        ry = min(height * 0.07, rx * 0.55)
+
+        for i, (node_id, _) in enumerate(leaves):
+
+            angle = -math.pi / 2 + 2 * math.pi * i / len(leaves)
+
+            positions[node_id] = (
+                cx + orbit_x * math.cos(angle),
+                cy + orbit_y * math.sin(angle),
+                rx,
+                ry
+            )
+
+        return positions
+
+    # ------------------------------
+    # Drawing
+    # ------------------------------
+
+    def fit_label(self, draw, label, rx, ry, scale):
+
+        # Largest font (22pt like the dot style, down to 10pt) whose wrapped
+        # text fits the box inscribed in the ellipse
+        max_width = rx * 1.4
+        max_height = ry * 1.4
+
+        for points in range(22, 9, -2):
+
+            font = self.font(max(1, int(points * scale)))
+            line_height = font.size * 1.2
+            lines = wrap_text(draw, label, font, max_width)
+
+            if len(lines) * line_height <= max_height:
+                return font, lines, line_height
+
+        keep = max(1, int(max_height // line_height))
+
+        if len(lines) > keep:
+            lines = lines[:keep]
+            lines[-1] = lines[-1].rstrip(" .,") + "..."
+
+        return font, lines, line_height
+
+    def boundary(self, cx, cy, rx, ry, dx, dy):
+
+        # Point where the ray from the center towards (dx, dy) leaves the ellipse
+        t = 1 / math.sqrt((dx / rx) ** 2 + (dy / ry) ** 2)
+
+        return cx + dx * t, cy + dy * t
+
+    def draw_edge(self, draw, start, end, scale):
+
+        sx, sy, srx, sry = start
+        ex, ey, erx, ery = end
+
+        dx, dy = ex - sx, ey - sy
+
+        if dx == 0 and dy == 0:
+            return
+
+        x0, y0 = self.boundary(sx, sy, srx, sry, dx, dy)
+        x1, y1 = self.boundary(ex, ey, erx, ery, -dx, -dy)
+
+        length = math.hypot(x1 - x0, y1 - y0) or 1
+        ux, uy = (x1 - x0) / length, (y1 - y0) / length
+
+        head = 14 * scale
+        base_x, base_y = x1 - ux * head, y1 - uy * head
+
+        draw.line((x0, y0, base_x, base_y), fill=OUTLINE, width=max(1, int(2 * scale)))
+        draw.polygon([
+            (x1, y1),
+            (base_x - uy * head * 0.45, base_y + ux * head * 0.45),
+            (base_x + uy * head * 0.45, base_y - ux * head * 0.45)
+        ], fill=OUTLINE)
+
+    def draw(self, spec, size):
+
+        width, height = size[0] * SUPERSAMPLE, size[1] * SUPERSAMPLE
+        scale = height / 720
+
+        img = Image.new("RGB", (width, height), BACKGROUND)
+        draw = ImageDraw.Draw(img)
+
+        if not spec["nodes"]:
+            return img.resize(size, Image.LANCZOS)
+
+        if spec["layout"] == "star":
+            positions = self.layout_star(spec, width, height)
+        else:
+            positions = self.layout_chain(spec, width, height)
+
+        for start, end in spec["edges"]:
+            self.draw_edge(draw, positions[start], positions[end], scale)
+
+        for node_id, label in spec["nodes"]:
+
+            cx, cy, rx, ry = positions[node_id]
+
+            draw.ellipse(
+                (cx - rx, cy - ry, cx + rx, cy + ry),
+                fill=FILL, outline=OUTLINE, width=max(1, int(2 * scale))
+            )
+
+            font, lines, line_height = self.fit_label(draw, label, rx, ry, scale)
+            y = cy - len(lines) * line_height / 2
+
+            for line in lines:
+                line_w = draw.textlength(line, font=font)
+                draw.text((cx - line_w / 2, y), line, fill=OUTLINE, font=font)
+                y += line_height
+
+        return img.resize(size, Image.LANCZOS)
+
+    def render(self, spec, path, size):
+
+        temp_path = path + ".tmp"
+
+        self.draw(spec, size).save(temp_path, format="PNG", compress_level=3)
+
+        os.replace(temp_path, path)
+
+
+# ==============================
+# RENDERER SELECTION
+# ==============================
+
+def get_diagram_renderer(name):
+
+    if name == "graphviz":
+        return GraphvizDiagramRenderer()
+
+    if name == "pil":
+        return PillowDiagramRenderer()
+
+    raise ValueError(f"Unknown diagram renderer: {name}")
+
+
+def select_diagram_renderer(name=None):
+
+    # auto prefers dot and falls back when the graphviz binary is missing
+    name = (name or os.environ.get("DIAGRAM_RENDERER", "auto")).lower()
+
+    if name != "auto":
+        return get_diagram_renderer(name)
+
+    graphviz = GraphvizDiagramRenderer()
+
+    if graphviz.is_available():
+        return graphviz
+
+    print("Graphviz not found, using in-process diagram renderer")
+
+    return PillowDiagramRenderer()
@@ -0,0 +1,268 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+import threading
+
+
+# ==============================
+# CACHE KEY
+# ==============================
+
+def make_key(*parts):
+
+    digest = hashlib.sha256()
+
+    for part in parts:
+        if not isinstance(part, str):
+            part = json.dumps(part, sort_keys=True)
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+
+    return digest.hexdigest()
+
+
+def file_digest(path):
+
+    digest = hashlib.sha256()
+
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+
+    return digest.hexdigest()
+
+
+# ==============================
+# LINK OR COPY
+# ==============================
+
+def link_or_copy(src, dest):
+
+    if os.path.exists(dest):
+        os.remove(dest)
+
+    # Hard link is free when cache and output share a filesystem
+    try:
+        os.link(src, dest)
+    except OSError:
+        shutil.copyfile(src, dest)
+
+
+# ==============================
+# PERSISTENT FILE CACHE (LRU)
+# ==============================
+
+class FileCache:
+
+    INDEX_NAME = "index.json"
+
+    def __init__(self, folder, max_bytes, extension=""):
+
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self.extension = extension
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        # Set when a hit refreshes last_used, so flush() knows to save
+        self.dirty = False
+
+        self.lock = threading.Lock()
+
+        os.makedirs(folder, exist_ok=True)
+
+        self.index = self.load_index()
+
+    # ------------------------------
+    # Index persistence
+    # ------------------------------
+
+    def index_path(self):
+        return os.path.join(self.folder, self.INDEX_NAME)
+
+    def load_index(self):
+
+        path = self.index_path()
+
+        if not os.path.exists(path):
+            return {}
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            print("Cache index unreadable, starting empty:", path)
+            return {}
+
+        # Drop entries whose file disappeared
+        return {
+            key: entry for key, entry in index.items()
+            if os.path.exists(os.path.join(self.folder, entry["file"]))
+        }
+
+    def save_index(self):
+
+        path = self.index_path()
+        temp_path = path + ".tmp"
+
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self.index, f)
+
+        os.replace(temp_path, path)
+
+        self.dirty = False
+
+    def flush(self):
+
+        # Hits only touch the in-memory index; persist their recency so
+        # entries reused every run are not the first to be evicted
+        with self.lock:
+            if self.dirty:
+                self.save_index()
+
+    # ------------------------------
+    # Lookup
+    # ------------------------------
+
+    def entry_path(self, entry):
+        return os.path.join(self.folder, entry["file"])
+
+    def get(self, key, record=True):
+
+        with self.lock:
+
+            entry = self.index.get(key)
+
+            if record and entry is not None:
+                self.hits += 1
+            elif record:
+                self.misses += 1
+
+            if entry is None:
+                return None
+
+            entry["last_used"] = time.time()
+            self.dirty = True
+
+            return self.entry_path(entry)
+
+    def record(self, hit):
+
+        with self.lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def meta(self, key):
+
+        with self.lock:
+            entry = self.index.get(key)
+            return dict(entry["meta"]) if entry else None
+
+    def entries(self):
+
+        with self.lock:
+            return [(key, dict(entry["meta"])) for key, entry in self.index.items()]
+
+    def copy_to(self, key, dest):
+
+        path = self.get(key)
+
+        if path is None:
+            return False
+
+        link_or_copy(path, dest)
+
+        return True
+
+    # ------------------------------
+    # Store
+    # ------------------------------
+
+    def put(self, key, src_path, meta=None, extension=None):
+
+        file_name = key + (self.extension if extension is None else extension)
+        cache_path = os.path.join(self.folder, file_name)
+
+        # Unique temp file: two workers may store the same key at once
+        handle, temp_path = tempfile.mkstemp(dir=self.folder, suffix=".tmp")
+        os.close(handle)
+
+        try:
+            shutil.copyfile(src_path, temp_path)
+            os.replace(temp_path, cache_path)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        with self.lock:
+
+            self.index[key] = {
+                "file": file_name,
+                "size": os.path.getsize(cache_path),
+                "last_used": time.time(),
+                "meta": meta or {}
+            }
+
+            self.evict()
+            self.save_index()
+
+        return cache_path
+
+    # ------------------------------
+    # Eviction (least recently used first)
+    # ------------------------------
+
+    def total_bytes(self):
+        return sum(entry["size"] for entry in self.index.values())
+
+    def evict(self):
+
+        total = self.total_bytes()
+
+        if total <= self.max_bytes:
+            return
+
+        by_age = sorted(self.index.items(), key=lambda item: item[1]["last_used"])
+
+        for key, entry in by_age:
+
+            if total <= self.max_bytes:
+                break
+
+            try:
+                os.remove(self.entry_path(entry))
+            except OSError:
+                pass
+
+            total -= entry["size"]
+            del self.index[key]
+            self.evictions += 1
+
+    # ------------------------------
+    # Statistics
+    # ------------------------------
+
+    def log_stats(self, label):
+
+        self.flush()
+
+        lookups = self.hits + self.misses
+        hit_rate = (self.hits / lookups * 100) if lookups else 0.0
+
+        with self.lock:
+            size_mb = self.total_bytes() / (1024 * 1024)
+            entries = len(self.index)
+
+        print(
+            f"{label} cache: {self.hits} hits, {self.misses} misses "
+            f"({hit_rate:.0f}% hit rate), {self.evictions} evicted, "
+            f"{entries} entries, {size_mb:.1f} MB"
+        )
@@ -1,5 +1,6 @@
 import os
 import re
+import json
 from langchain_ollama import OllamaLLM
 
 # ==============================
@@ -13,6 +14,9 @@ STORYBOARD_FILE = os.path.join(DATA_FOLDER, "storyboard.txt")
 NARRATION_FILE = os.path.join(DATA_FOLDER, "narration.txt")
 VISUAL_FILE = os.path.join(DATA_FOLDER, "visual_prompts.txt")
 
+# Scenes are appended here as soon as they are parsed, so TTS can start early
+NARRATION_STREAM_FILE = os.path.join(DATA_FOLDER, "narration_stream.jsonl")
+
 OLLAMA_MODEL = "phi3:mini"
 TOTAL_SCENES = 10
 
@@ -54,6 +58,53 @@ def count_scenes(text):
     return len(re.findall(r"Scene\s+\d+", text))
 
 
+# ==============================
+# PUBLISH NARRATION AS IT ARRIVES
+# ==============================
+
+def append_stream_record(record):
+
+    with open(NARRATION_STREAM_FILE, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+        f.flush()
+
+
+def reset_narration_stream():
+
+    with open(NARRATION_STREAM_FILE, "w", encoding="utf-8"):
+        pass
+
+
+def publish_complete_scenes(text, attempt, published, final=False):
+
+    scenes = split_scenes(text)
+
+    # The last scene may still be streaming unless the answer is finished
+    if not final:
+        scenes = scenes[:-1]
+
+    # Records are numbered like narration.txt entries, not like raw chunks
+    narration_count = 0
+
+    for number, scene in enumerate(scenes, start=1):
+
+        narration = extract_field(scene, "Narration")
+
+        if narration is None:
+            continue
+
+        narration_count += 1
+
+        if number > published:
+            append_stream_record({"attempt": attempt, "scene": narration_count, "narration": narration})
+
+    return len(scenes)
+
+
+def finish_narration_stream(scene_count):
+    append_stream_record({"done": True, "scenes": scene_count})
+
+
 # ==============================
 # GENERATE STORYBOARD
 # ==============================
@@ -119,7 +170,16 @@ Continue until Scene 10 only.
 
         print(f"Generating storyboard attempt {attempt+1}...")
 
-        result = llm.invoke(prompt).strip()
+        result = ""
+        published = 0
+
+        # Stream tokens so finished scenes reach the audio stage immediately
+        for chunk in llm.stream(prompt):
+            result += chunk
+            published = publish_complete_scenes(result, attempt + 1, published)
+
+        result = result.strip()
+        publish_complete_scenes(result, attempt + 1, published, final=True)
 
         scene_count = count_scenes(result)
 
@@ -151,33 +211,36 @@ Continue until Scene 10 only.
 # PARSE STORYBOARD
 # ==============================
 
-def parse_storyboard(storyboard):
-
-    narration_list = []
-    visual_list = []
+def split_scenes(storyboard):
 
     scenes = re.split(r"Scene\s+\d+", storyboard)
 
-    scene_number = 1
+    return [scene for scene in scenes if scene.strip() != ""]
 
-    for scene in scenes:
 
-        if scene.strip() == "":
-            continue
+def extract_field(scene, field):
+
+    match = re.search(field + r":\s*(.*)", scene)
+
+    return match.group(1).strip() if match else None
 
-        narration_match = re.search(r"Narration:\s*(.*)", scene)
-        visual_match = re.search(r"Visual:\s*(.*)", scene)
 
-        if narration_match:
-            narration_text = narration_match.group(1).strip()
+def parse_storyboard(storyboard):
+
+    narration_list = []
+    visual_list = []
+
+    for scene_number, scene in enumerate(split_scenes(storyboard), start=1):
+
+        narration_text = extract_field(scene, "Narration")
+        visual_text = extract_field(scene, "Visual")
+
+        if narration_text is not None:
             narration_list.append(f"Scene {scene_number}\n{narration_text}")
 
-        if visual_match:
-            visual_text = visual_match.group(1).strip()
+        if visual_text is not None:
             visual_list.append(f"Scene {scene_number}\n{visual_text}")
 
-        scene_number += 1
-
     return narration_list, visual_list
 
 
@@ -211,10 +274,15 @@ if __name__ == "__main__":
     project_text = read_project()
 
     if project_text is None:
+        # Release an audio stage that is waiting on the stream
+        reset_narration_stream()
+        finish_narration_stream(0)
         exit()
 
     llm = load_llm()
 
+    reset_narration_stream()
+
     print("\nGenerating storyboard...\n")
 
     storyboard = generate_storyboard(project_text, llm)
@@ -228,4 +296,7 @@ if __name__ == "__main__":
     save_file(NARRATION_FILE, narration)
     save_file(VISUAL_FILE, visuals)
 
+    # narration.txt is final now; the audio stage reconciles against it
+    finish_narration_stream(len(narration))
+
     print("\nFinished generating files.")
\ No newline at end of file
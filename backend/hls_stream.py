@@ -0,0 +1,94 @@
+import os
+import math
+
+from audio_timeline import pcm_input_args
+from still_renderer import audio_codec_args, run_ffmpeg
+
+
+# ==============================
+# SETTINGS
+# ==============================
+
+# Served by Flask under /api/stream/<job_id>/
+STREAM_FOLDER = "stream"
+PLAYLIST_NAME = "playlist.m3u8"
+
+# Printed once the first scene is playable; app.py watches for it
+READY_MARKER = "STAGE: STREAM_READY"
+
+
+# ==============================
+# GROWING HLS PLAYLIST
+# ==============================
+
+class HlsPlaylist:
+
+    def __init__(self, folder, durations, profile):
+
+        self.folder = folder
+        self.profile = profile
+        self.published = []
+
+        # Every scene length is known up front, so the target never changes
+        self.target_duration = max(1, math.ceil(max(durations, default=1)))
+
+        os.makedirs(folder, exist_ok=True)
+
+        for file in os.listdir(folder):
+            os.remove(os.path.join(folder, file))
+
+    def playlist_path(self):
+        return os.path.join(self.folder, PLAYLIST_NAME)
+
+    def write(self, finished=False):
+
+        lines = [
+            "#EXTM3U",
+            "#EXT-X-VERSION:3",
+            f"#EXT-X-TARGETDURATION:{self.target_duration}",
+            "#EXT-X-MEDIA-SEQUENCE:0",
+            "#EXT-X-PLAYLIST-TYPE:EVENT"
+        ]
+
+        for name, duration in self.published:
+            lines.append(f"#EXTINF:{duration:.3f},")
+            lines.append(name)
+
+        if finished:
+            lines.append("#EXT-X-ENDLIST")
+
+        path = self.playlist_path()
+        temp_path = path + ".tmp"
+
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+        # Players polling the playlist never see a half-written file
+        os.replace(temp_path, path)
+
+    def publish(self, index, segment_path, start, duration, audio):
+
+        # Called in scene order; the segment keeps its place on the timeline.
+        # Segments are video only, so the scene's slice of the PCM timeline
+        # is encoded alongside (the downloadable mp4 gets one full encode)
+        name = f"scene_{index}.ts"
+
+        args = ["-i", segment_path] + pcm_input_args()
+        args += ["-map", "0:v", "-map", "1:a", "-c:v", "copy", "-bsf:v", "h264_mp4toannexb"]
+        args += audio_codec_args(self.profile)
+        args += [
+            "-output_ts_offset", f"{start:.3f}",
+            "-f", "mpegts",
+            os.path.join(self.folder, name)
+        ]
+
+        run_ffmpeg(args, input=audio.tobytes())
+
+        self.published.append((name, duration))
+        self.write()
+
+        if len(self.published) == 1:
+            print(READY_MARKER, flush=True)
+
+    def finish(self):
+        self.write(finished=True)
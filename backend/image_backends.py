@@ -0,0 +1,398 @@
+import os
+import re
+import time
+import hashlib
+import threading
+
+import requests
+from PIL import Image, ImageDraw
+
+from image_ingest import normalize_image
+from render_profiles import get_output_size
+from render_resources import load_font, wrap_text
+
+
+# ==============================
+# SETTINGS
+# ==============================
+
+COLAB_URL = os.environ.get(
+    "IMAGE_SERVER_URL",
+    "https://saylor-semiautonomous-adelyn.ngrok-free.dev/generate"
+)
+
+# Total time allowed for one image (connect + generate + download)
+REQUEST_DEADLINE = float(os.environ.get("IMAGE_REQUEST_DEADLINE", "300"))
+
+CONNECT_TIMEOUT = 10
+HEALTH_TIMEOUT = 5
+CHUNK_SIZE = 64 * 1024
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+# ==============================
+# PROMPT STYLE
+# ==============================
+
+def enhance_prompt(prompt):
+
+    return (
+        prompt +
+        ", flat vector infographic, educational diagram, "
+        "white background, modern UI icons, minimal colors, "
+        "professional explainer video style, clean vector illustration, 4k"
+    )
+
+
+# ==============================
+# REMOTE HTTP BACKEND
+# ==============================
+
+class RemoteImageBackend:
+
+    name = "remote"
+
+    def __init__(self, url=COLAB_URL, deadline=REQUEST_DEADLINE, size=None):
+
+        self.url = url
+        self.deadline = deadline
+        self.size = size or get_output_size()
+        self.thread_state = threading.local()
+
+    def params(self):
+        return {"backend": self.name, "url": self.url, "size": list(self.size)}
+
+    def get_session(self):
+
+        # requests.Session is not safe to share between threads
+        if not hasattr(self.thread_state, "session"):
+            self.thread_state.session = requests.Session()
+
+        return self.thread_state.session
+
+    def is_available(self):
+
+        # Any HTTP answer means the server is up, except ngrok's offline page
+        try:
+            response = self.get_session().get(self.url, timeout=HEALTH_TIMEOUT)
+        except requests.exceptions.RequestException as e:
+            print("Remote image server unreachable:", e)
+            return False
+
+        if response.headers.get("ngrok-error-code"):
+            print("Remote image tunnel offline:", response.headers["ngrok-error-code"])
+            return False
+
+        return True
+
+    def generate(self, prompt, image_path, timeout=None):
+
+        limit = min(self.deadline, timeout) if timeout else self.deadline
+        deadline = time.monotonic() + limit
+
+        response = self.get_session().post(
+            self.url,
+            json={"prompt": enhance_prompt(prompt)},
+            timeout=(min(CONNECT_TIMEOUT, limit), limit),
+            stream=True
+        )
+
+        with response:
+
+            if response.status_code != 200:
+                raise requests.exceptions.HTTPError(
+                    f"Server error {response.status_code}: {response.text[:200]}"
+                )
+
+            # Stream straight to disk instead of holding the PNG in memory
+            temp_path = image_path + ".part"
+
+            try:
+
+                with open(temp_path, "wb") as f:
+
+                    for chunk in response.iter_content(CHUNK_SIZE):
+
+                        if time.monotonic() > deadline:
+                            raise DeadlineExceeded(
+                                f"Image not received within {limit:.0f}s"
+                            )
+
+                        f.write(chunk)
+
+                normalize_image(temp_path, image_path, self.size)
+
+            finally:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+
+
+# ==============================
+# LOCAL PROCEDURAL BACKEND
+# ==============================
+
+# keyword -> icon drawn by LocalImageBackend.draw_icon
+ICON_KEYWORDS = {
+    "user": "user", "people": "user", "person": "user", "student": "user",
+    "patient": "user", "farmer": "user", "customer": "user",
+    "database": "database", "storage": "database", "data": "database",
+    "record": "database",
+    "cloud": "cloud", "internet": "cloud", "online": "cloud",
+    "server": "server", "backend": "server", "api": "server",
+    "sensor": "sensor", "iot": "sensor", "device": "sensor",
+    "camera": "sensor", "hardware": "sensor",
+    "chart": "chart", "dashboard": "chart", "analytics": "chart",
+    "graph": "chart", "report": "chart", "output": "chart",
+    "security": "lock", "secure": "lock", "encryption": "lock",
+    "authentication": "lock", "privacy": "lock",
+    "ai": "brain", "model": "brain", "machine learning": "brain",
+    "neural": "brain", "prediction": "brain", "intelligent": "brain",
+    "process": "gear", "workflow": "gear", "engine": "gear",
+    "system": "gear", "automation": "gear", "software": "gear",
+    "mobile": "phone", "app": "phone", "smartphone": "phone",
+    "document": "document", "input": "document", "file": "document",
+    "benefit": "star", "conclusion": "star", "summary": "star",
+    "goal": "star", "problem": "warning", "challenge": "warning",
+    "issue": "warning",
+}
+
+PALETTES = [
+    ("#1f6feb", "#dbeafe", "#0b3d91"),
+    ("#0f9d58", "#dcfce7", "#0b5d36"),
+    ("#f97316", "#ffedd5", "#9a3412"),
+    ("#7c3aed", "#ede9fe", "#4c1d95"),
+    ("#0891b2", "#cffafe", "#155e75"),
+]
+
+ICON_PATTERN = re.compile(
+    r"\b(" + "|".join(
+        re.escape(k) for k in sorted(ICON_KEYWORDS, key=len, reverse=True)
+    ) + r")s?\b"
+)
+
+
+class LocalImageBackend:
+
+    name = "local"
+    version = 1
+
+    def __init__(self, size=None):
+
+        self.size = size or get_output_size()
+
+    def params(self):
+        return {"backend": self.name, "version": self.version, "size": list(self.size)}
+
+    def is_available(self):
+        return True
+
+    def font(self, size):
+        return load_font(size)
+
+    # ------------------------------
+    # Prompt analysis
+    # ------------------------------
+
+    def split_prompt(self, prompt):
+
+        # "Diagram showing A, B and C" -> title "Diagram", body "A, B and C"
+        parts = re.split(
+            r"\s+(?:showing|of|depicting|illustrating|with)\s+|:", prompt, maxsplit=1
+        )
+
+        title = parts[0].strip(" ,.")
+        body = parts[1] if len(parts) > 1 and parts[1].strip() else prompt
+
+        if len(title) > 60:
+            title = title[:57].rsplit(" ", 1)[0] + "..."
+
+        return title[:1].upper() + title[1:], body
+
+    def split_components(self, body):
+
+        # "sensor → cloud → dashboard" style prompts become a flow
+        if re.search(r"→|->", body):
+            parts = re.split(r"\s*(?:→|->)\s*", body)
+            return [p.strip(" ,.") for p in parts if p.strip(" ,.")], True
+
+        parts = re.split(r",|\band\b|;|\.", body)
+
+        return [p.strip(" ,.") for p in parts if len(p.strip(" ,.")) > 2], False
+
+    def find_icons(self, text):
+
+        icons = []
+
+        for match in ICON_PATTERN.finditer(text.lower()):
+            icon = ICON_KEYWORDS[match.group(1)]
+            if icon not in icons:
+                icons.append(icon)
+
+        return icons
+
+    # ------------------------------
+    # Drawing
+    # ------------------------------
+
+    def draw_icon(self, draw, icon, cx, cy, r, color):
+
+        w = max(2, r // 8)
+
+        if icon == "user":
+            draw.ellipse((cx - r // 3, cy - r, cx + r // 3, cy - r // 3), outline=color, width=w)
+            draw.arc((cx - r * 2 // 3, cy - r // 5, cx + r * 2 // 3, cy + r * 4 // 3), 180, 360, fill=color, width=w)
+        elif icon == "database":
+            for dy in (-r // 2, 0, r // 2):
+                draw.ellipse((cx - r * 2 // 3, cy + dy - r // 4, cx + r * 2 // 3, cy + dy + r // 4), outline=color, width=w)
+        elif icon == "cloud":
+            draw.ellipse((cx - r, cy - r // 4, cx - r // 6, cy + r // 2), outline=color, width=w)
+            draw.ellipse((cx - r // 2, cy - r * 2 // 3, cx + r // 3, cy + r // 3), outline=color, width=w)
+            draw.ellipse((cx, cy - r // 3, cx + r, cy + r // 2), outline=color, width=w)
+        elif icon == "server":
+            for dy in (-r * 2 // 3, -r // 6, r // 3):
+                draw.rectangle((cx - r * 2 // 3, cy + dy, cx + r * 2 // 3, cy + dy + r * 2 // 5), outline=color, width=w)
+        elif icon == "sensor":
+            draw.ellipse((cx - r // 5, cy - r // 5, cx + r // 5, cy + r // 5), fill=color)
+            for k in (2, 3):
+                rr = r * k // 3
+                draw.arc((cx - rr, cy - rr, cx + rr, cy + rr), 300, 60, fill=color, width=w)
+                draw.arc((cx - rr, cy - rr, cx + rr, cy + rr), 120, 240, fill=color, width=w)
+        elif icon == "chart":
+            for k, h in enumerate((0.4, 0.8, 0.6, 1.0)):
+                x0 = cx - r + k * r // 2
+                draw.rectangle((x0, cy + r - int(h * r * 1.6), x0 + r // 3, cy + r), fill=color)
+        elif icon == "lock":
+            draw.rectangle((cx - r // 2, cy - r // 6, cx + r // 2, cy + r * 2 // 3), fill=color)
+            draw.arc((cx - r // 3, cy - r * 2 // 3, cx + r // 3, cy + r // 3), 180, 360, fill=color, width=w)
+        elif icon == "brain":
+            points = [(cx - r // 2, cy - r // 3), (cx + r // 2, cy - r // 3),
+                      (cx, cy + r // 2), (cx - r // 2, cy + r // 3), (cx + r // 2, cy + r // 3)]
+            for a in points:
+                for b in points:
+                    draw.line((a, b), fill=color, width=max(1, w // 2))
+            for x, y in points:
+                draw.ellipse((x - r // 8, y - r // 8, x + r // 8, y + r // 8), fill=color)
+        elif icon == "gear":
+            draw.ellipse((cx - r * 2 // 3, cy - r * 2 // 3, cx + r * 2 // 3, cy + r * 2 // 3), outline=color, width=w * 2)
+            draw.ellipse((cx - r // 5, cy - r // 5, cx + r // 5, cy + r // 5), fill=color)
+        elif icon == "phone":
+            draw.rounded_rectangle((cx - r // 2, cy - r, cx + r // 2, cy + r), radius=r // 6, outline=color, width=w)
+            draw.ellipse((cx - r // 10, cy + r * 2 // 3, cx + r // 10, cy + r * 5 // 6), fill=color)
+        elif icon == "document":
+            draw.rectangle((cx - r // 2, cy - r * 2 // 3, cx + r // 2, cy + r * 2 // 3), outline=color, width=w)
+            for dy in (-r // 3, 0, r // 3):
+                draw.line((cx - r // 3, cy + dy, cx + r // 3, cy + dy), fill=color, width=w)
+        elif icon == "warning":
+            draw.polygon([(cx, cy - r), (cx + r, cy + r * 2 // 3), (cx - r, cy + r * 2 // 3)], outline=color, width=w)
+            draw.line((cx, cy - r // 3, cx, cy + r // 5), fill=color, width=w)
+        else:
+            draw.polygon([(cx, cy - r), (cx + r // 4, cy - r // 4), (cx + r, cy - r // 4),
+                          (cx + r // 3, cy + r // 4), (cx + r * 2 // 3, cy + r),
+                          (cx, cy + r // 2), (cx - r * 2 // 3, cy + r), (cx - r // 3, cy + r // 4),
+                          (cx - r, cy - r // 4), (cx - r // 4, cy - r // 4)], fill=color)
+
+    def render(self, prompt):
+
+        width, height = self.size
+        scale = height / 720
+
+        seed = int(hashlib.md5(prompt.encode("utf-8")).hexdigest(), 16)
+        accent, fill, dark = PALETTES[seed % len(PALETTES)]
+
+        img = Image.new("RGB", self.size, "white")
+        draw = ImageDraw.Draw(img)
+
+        # Title bar
+        title_font = self.font(int(44 * scale))
+        draw.rectangle((0, 0, width, int(110 * scale)), fill=accent)
+        title, body = self.split_prompt(prompt)
+        title_lines = wrap_text(draw, title, title_font, width - int(100 * scale))[:3]
+        title = title_lines[0] + ("..." if len(title_lines) > 1 else "")
+        draw.text((int(50 * scale), int(30 * scale)), title, fill="white", font=title_font)
+
+        components, is_flow = self.split_components(body)
+        components = components[:5] or [prompt]
+
+        fallback_icons = self.find_icons(prompt) or ["gear"]
+
+        # Layout boxes in a row
+        box_font = self.font(int(22 * scale))
+        margin = int(50 * scale)
+        gap = int(50 * scale)
+        count = len(components)
+        box_w = (width - 2 * margin - gap * (count - 1)) // count
+        box_h = int(380 * scale)
+        top = int(190 * scale)
+
+        for i, component in enumerate(components):
+
+            x0 = margin + i * (box_w + gap)
+            draw.rounded_rectangle(
+                (x0, top, x0 + box_w, top + box_h),
+                radius=int(24 * scale), fill=fill, outline=accent, width=max(2, int(3 * scale))
+            )
+
+            icons = self.find_icons(component)
+            icon = icons[0] if icons else fallback_icons[i % len(fallback_icons)]
+            icon_r = min(box_w // 4, int(70 * scale))
+            self.draw_icon(draw, icon, x0 + box_w // 2, top + int(120 * scale), icon_r, dark)
+
+            lines = wrap_text(draw, component[:1].upper() + component[1:], box_font, box_w - int(30 * scale))[:3]
+            y = top + int(230 * scale)
+
+            for line in lines:
+                line_w = draw.textlength(line, font=box_font)
+                draw.text((x0 + (box_w - line_w) // 2, y), line, fill=dark, font=box_font)
+                y += int(30 * scale)
+
+            # Arrow to next box
+            if i < count - 1:
+                ay = top + box_h // 2
+                ax0 = x0 + box_w + int(8 * scale)
+                ax1 = x0 + box_w + gap - int(8 * scale)
+                draw.line((ax0, ay, ax1, ay), fill=accent if is_flow else "#9ca3af", width=max(2, int(4 * scale)))
+                draw.polygon([(ax1, ay), (ax1 - int(12 * scale), ay - int(8 * scale)),
+                              (ax1 - int(12 * scale), ay + int(8 * scale))], fill=accent if is_flow else "#9ca3af")
+
+        # Footer strip
+        draw.rectangle((0, height - int(40 * scale), width, height), fill=fill)
+
+        return img
+
+    def generate(self, prompt, image_path, timeout=None):
+        self.render(prompt).save(image_path, format="PNG")
+
+
+# ==============================
+# BACKEND SELECTION
+# ==============================
+
+def get_backend(name):
+
+    if name == "remote":
+        return RemoteImageBackend()
+
+    if name == "local":
+        return LocalImageBackend()
+
+    raise ValueError(f"Unknown image backend: {name}")
+
+
+def select_backend(name=None):
+
+    name = (name or os.environ.get("IMAGE_BACKEND", "auto")).lower()
+
+    if name != "auto":
+        return get_backend(name)
+
+    remote = RemoteImageBackend()
+
+    if remote.is_available():
+        return remote
+
+    print("Falling back to local image renderer")
+
+    return LocalImageBackend()
@@ -0,0 +1,140 @@
+import os
+import re
+import math
+import hashlib
+
+from file_cache import FileCache, make_key, link_or_copy
+
+
+# ==============================
+# SETTINGS
+# ==============================
+
+CACHE_FOLDER = os.path.join("cache", "images")
+
+CACHE_MAX_MB = float(os.environ.get("IMAGE_CACHE_MAX_MB", "500"))
+
+# Cosine similarity needed to reuse a close-enough image (0 disables it)
+SIMILARITY_THRESHOLD = float(os.environ.get("IMAGE_CACHE_SIMILARITY", "0"))
+
+EMBEDDING_DIM = 256
+
+
+# ==============================
+# PROMPT NORMALIZATION
+# ==============================
+
+def normalize_prompt(prompt):
+
+    prompt = prompt.lower()
+    prompt = re.sub(r"[^\w\s→,-]", " ", prompt)
+    prompt = re.sub(r"\s+", " ", prompt)
+
+    return prompt.strip(" ,.")
+
+
+# ==============================
+# LIGHTWEIGHT PROMPT EMBEDDING
+# ==============================
+
+def embed_prompt(prompt):
+
+    # Hashed bag of words + bigrams: no model download, stable across runs
+    words = re.findall(r"\w+", normalize_prompt(prompt))
+    features = words + [a + " " + b for a, b in zip(words, words[1:])]
+
+    vector = [0.0] * EMBEDDING_DIM
+
+    for feature in features:
+        digest = hashlib.md5(feature.encode("utf-8")).digest()
+        slot = int.from_bytes(digest[:4], "little") % EMBEDDING_DIM
+        sign = 1.0 if digest[4] & 1 else -1.0
+        vector[slot] += sign
+
+    norm = math.sqrt(sum(v * v for v in vector))
+
+    if norm == 0:
+        return vector
+
+    return [round(v / norm, 5) for v in vector]
+
+
+def cosine(a, b):
+    return sum(x * y for x, y in zip(a, b))
+
+
+# ==============================
+# IMAGE CACHE
+# ==============================
+
+class ImageCache:
+
+    def __init__(self, folder=CACHE_FOLDER, max_mb=CACHE_MAX_MB,
+                 similarity=SIMILARITY_THRESHOLD):
+
+        self.files = FileCache(folder, int(max_mb * 1024 * 1024), ".png")
+        self.similarity = similarity
+        self.similar_hits = 0
+
+    def key_for(self, enhanced_prompt, params):
+        return make_key(normalize_prompt(enhanced_prompt), params)
+
+    def find_similar(self, enhanced_prompt, params):
+
+        vector = embed_prompt(enhanced_prompt)
+        params_key = make_key(params)
+
+        best_key = None
+        best_score = self.similarity
+
+        for key, meta in self.files.entries():
+
+            if meta.get("params") != params_key or "embedding" not in meta:
+                continue
+
+            score = cosine(vector, meta["embedding"])
+
+            if score >= best_score:
+                best_key = key
+                best_score = score
+
+        return best_key
+
+    def fetch(self, enhanced_prompt, params, dest):
+
+        key = self.key_for(enhanced_prompt, params)
+        path = self.files.get(key, record=False)
+
+        if path is None and self.similarity > 0:
+
+            similar_key = self.find_similar(enhanced_prompt, params)
+
+            if similar_key is not None:
+                path = self.files.get(similar_key, record=False)
+                self.similar_hits += 1
+
+        self.files.record(path is not None)
+
+        if path is None:
+            return False
+
+        link_or_copy(path, dest)
+
+        return True
+
+    def store(self, enhanced_prompt, params, image_path):
+
+        # Embedding is always kept so similarity can be switched on later
+        meta = {
+            "params": make_key(params),
+            "embedding": embed_prompt(enhanced_prompt)
+        }
+
+        self.files.put(self.key_for(enhanced_prompt, params), image_path, meta)
+
+    def log_stats(self):
+
+        self.files.log_stats("Image")
+
+        if self.similarity > 0:
+            print(f"Image cache similarity reuses: {self.similar_hits}")
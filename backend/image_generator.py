@@ -1,12 +1,44 @@
 import requests
 import os
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from pipeline_metrics import log_latency_summary
+from image_cache import ImageCache
+from image_backends import DeadlineExceeded, LocalImageBackend, enhance_prompt, select_backend
+from circuit_breaker import CircuitBreaker, CircuitOpenError, call_with_retry
+
+
+# ==============================
+# CONCURRENCY SETTINGS
+# ==============================
+
+# Number of prompts sent to the generator at the same time
+MAX_IN_FLIGHT = int(os.environ.get("IMAGE_MAX_IN_FLIGHT", "4"))
+
+# Scene -> image slot map, read by diagram_generator to number its images
+MANIFEST_NAME = "manifest.json"
 
 
 # ==============================
-# COLAB SERVER URL
+# FAILURE HANDLING SETTINGS
 # ==============================
 
-COLAB_URL = "https://saylor-semiautonomous-adelyn.ngrok-free.dev/generate"
+# Extra attempts per scene after the first failure
+RETRIES = int(os.environ.get("IMAGE_RETRIES", "2"))
+
+# First backoff delay in seconds, doubled on each retry
+BACKOFF_SECONDS = float(os.environ.get("IMAGE_BACKOFF", "1"))
+
+# Consecutive failures before the endpoint is treated as down
+BREAKER_THRESHOLD = int(os.environ.get("IMAGE_BREAKER_THRESHOLD", "3"))
+BREAKER_COOLDOWN = float(os.environ.get("IMAGE_BREAKER_COOLDOWN", "30"))
+
+# Whole image stage must finish within this many seconds
+STAGE_DEADLINE = float(os.environ.get("IMAGE_STAGE_DEADLINE", "600"))
+
+RETRYABLE_ERRORS = (requests.exceptions.RequestException, DeadlineExceeded, OSError)
 
 
 # ==============================
@@ -87,11 +119,87 @@ def clear_old_images(folder):
         print(f"Deleted {deleted} old images")
 
 
+# ==============================
+# SINGLE IMAGE
+# ==============================
+
+def generate_one(index, prompt, output_folder, cache, backend, breaker, deadline):
+
+    # Name by scene index so completion order does not matter
+    image_path = os.path.join(output_folder, f"image_{index+1}.png")
+    enhanced = enhance_prompt(prompt)
+
+    if cache.fetch(enhanced, backend.params(), image_path):
+        return image_path, None
+
+    started = time.monotonic()
+
+    call_with_retry(
+        lambda remaining: backend.generate(prompt, image_path, timeout=remaining),
+        breaker,
+        retries=RETRIES,
+        backoff=BACKOFF_SECONDS,
+        deadline=deadline,
+        retry_on=RETRYABLE_ERRORS
+    )
+
+    latency = time.monotonic() - started
+
+    # The image is already saved: a cache write problem must not fail the scene
+    try:
+        cache.store(enhanced, backend.params(), image_path)
+    except OSError as e:
+        print(f"Could not cache {image_path}:", e)
+
+    return image_path, latency
+
+
+# ==============================
+# PLACEHOLDER FOR FAILED SCENES
+# ==============================
+
+def write_placeholder(index, prompt, output_folder, renderer):
+
+    # Same prompt always gives the same card, and the scene keeps its slot
+    image_path = os.path.join(output_folder, f"image_{index+1}.png")
+
+    renderer.generate(prompt, image_path)
+
+    return image_path
+
+
+# ==============================
+# SCENE MANIFEST
+# ==============================
+
+def write_manifest(output_folder, prompts, sources):
+
+    scenes = [
+        {
+            "index": i,
+            "file": f"image_{i+1}.png",
+            "prompt": prompt,
+            "source": sources.get(i, "missing")
+        }
+        for i, prompt in enumerate(prompts)
+    ]
+
+    path = os.path.join(output_folder, MANIFEST_NAME)
+    temp_path = path + ".tmp"
+
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump({"scenes": scenes, "diagrams": []}, f, indent=2)
+
+    os.replace(temp_path, path)
+
+    print("Saved:", path)
+
+
 # ==============================
 # IMAGE GENERATION
 # ==============================
 
-def generate_images():
+def generate_images(backend_name=None):
 
     prompts = read_prompts()
 
@@ -102,43 +210,78 @@ def generate_images():
     output_folder = "images"
     os.makedirs(output_folder, exist_ok=True)
 
-    # Remove previous images
+    # Remove previous images (reusable ones stay in the cache)
     clear_old_images(output_folder)
 
-    session = requests.Session()
+    cache = ImageCache()
+    backend = select_backend(backend_name)
+
+    workers = max(1, min(MAX_IN_FLIGHT, len(prompts)))
+
+    print(f"Generating {len(prompts)} images with {backend.name} backend, {workers} in flight")
+
+    breaker = CircuitBreaker(BREAKER_THRESHOLD, BREAKER_COOLDOWN)
+
+    latencies = []
+    failed = []
+    sources = {}
+    stage_start = time.monotonic()
+    deadline = stage_start + STAGE_DEADLINE
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+
+        futures = {
+            pool.submit(
+                generate_one, i, prompt, output_folder, cache, backend, breaker, deadline
+            ): i
+            for i, prompt in enumerate(prompts)
+        }
+
+        for future in as_completed(futures):
+
+            i = futures[future]
+
+            try:
+
+                image_path, latency = future.result()
+
+                if latency is None:
+                    print(f"Reused from cache: {image_path}")
+                    sources[i] = "cache"
+                    continue
+
+                latencies.append(latency)
+                sources[i] = backend.name
+
+                print(f"Saved: {image_path} ({latency:.2f}s)")
 
-    for i, prompt in enumerate(prompts):
+            except RETRYABLE_ERRORS + (CircuitOpenError, TimeoutError) as e:
+                print(f"Image {i+1}/{len(prompts)} failed:", e)
+                failed.append(i)
 
-        print(f"\nGenerating Image {i+1}/{len(prompts)}")
+            # Anything else (a bad image from normalize_image, ...) still only
+            # costs this scene its image, never the whole stage
+            except Exception as e:
+                print(f"Image {i+1}/{len(prompts)} failed unexpectedly: {type(e).__name__}: {e}")
+                failed.append(i)
 
-        enhanced_prompt = (
-            prompt +
-            ", flat vector infographic, educational diagram, "
-            "white background, modern UI icons, minimal colors, "
-            "professional explainer video style, clean vector illustration, 4k"
-        )
+    if failed:
 
-        try:
+        print(f"Writing placeholders for {len(failed)} failed scenes")
 
-            response = session.post(
-                COLAB_URL,
-                json={"prompt": enhanced_prompt},
-                timeout=300
-            )
+        renderer = LocalImageBackend()
 
-            if response.status_code != 200:
-                print("Server error:", response.text)
-                continue
+        for i in sorted(failed):
+            print("Placeholder:", write_placeholder(i, prompts[i], output_folder, renderer))
+            sources[i] = "placeholder"
 
-            image_path = os.path.join(output_folder, f"image_{i+1}.png")
+    write_manifest(output_folder, prompts, sources)
 
-            with open(image_path, "wb") as f:
-                f.write(response.content)
+    print(f"Image stage took {time.monotonic() - stage_start:.2f}s")
 
-            print("Saved:", image_path)
+    log_latency_summary("Image request", latencies)
 
-        except requests.exceptions.RequestException as e:
-            print("Request failed:", e)
+    cache.log_stats()
 
 
 # ==============================
@@ -0,0 +1,39 @@
+import os
+from PIL import Image, ImageOps
+
+
+# ==============================
+# NORMALIZE TO RENDER RESOLUTION
+# ==============================
+
+BACKGROUND = (255, 255, 255)
+
+
+def normalize_image(src_path, dest_path, size):
+
+    # Decode once, letterbox to the output frame, never resize at render time
+    with Image.open(src_path) as img:
+
+        # JPEG sources can be decoded at reduced scale directly
+        img.draft("RGB", size)
+
+        img = img.convert("RGB")
+
+        if img.size != size:
+
+            # Scale up as well as down so the image fills the frame on one axis
+            img = ImageOps.contain(img, size, Image.LANCZOS)
+
+            frame = Image.new("RGB", size, BACKGROUND)
+            frame.paste(img, ((size[0] - img.width) // 2, (size[1] - img.height) // 2))
+            img = frame
+
+        temp_path = dest_path + ".tmp"
+
+        # Flat infographics and text stay sharp in PNG; low compression
+        # level keeps encode and decode cheap
+        img.save(temp_path, format="PNG", compress_level=3)
+
+    os.replace(temp_path, dest_path)
+
+    return dest_path
@@ -0,0 +1,61 @@
+import re
+from collections import Counter
+
+
+# ==============================
+# SINGLE-PASS KEYWORD MATCHER
+# ==============================
+
+# Characters that count as part of a token, so "c" does not match inside
+# "c++" or "script", and "go" does not match inside "google"
+TOKEN_CHARS = r"\w+#"
+
+# A version number glued to a keyword still counts as that keyword, so
+# "Python3", "HTML5" and "Python3.11" match "python" and "html"
+VERSION_SUFFIX = r"(?:\d+(?:\.\d+)*)?"
+
+
+class KeywordMatcher:
+
+    def __init__(self, keywords, plurals=False):
+
+        self.keywords = list(dict.fromkeys(k.lower() for k in keywords))
+
+        # Longest first so "react native" wins over "react"
+        alternation = "|".join(
+            re.escape(k) for k in sorted(self.keywords, key=len, reverse=True)
+        )
+
+        suffix = r"(?:e?s)?" if plurals else ""
+
+        self.pattern = re.compile(
+            rf"(?<![{TOKEN_CHARS}])({alternation}){suffix}{VERSION_SUFFIX}(?![{TOKEN_CHARS}])",
+            re.IGNORECASE
+        )
+
+    def find_all(self, text):
+
+        # (keyword, start, end) for every match, in one scan of the text
+        return [
+            (match.group(1).lower(), match.start(), match.end())
+            for match in self.pattern.finditer(text)
+        ]
+
+    def counts(self, text):
+        return Counter(keyword for keyword, _, _ in self.find_all(text))
+
+    def positions(self, text):
+
+        found = {}
+
+        for keyword, start, _ in self.find_all(text):
+            found.setdefault(keyword, []).append(start)
+
+        return found
+
+    def present(self, text):
+
+        # Matched keywords in the order they were declared
+        found = self.counts(text)
+
+        return [k for k in self.keywords if k in found]
@@ -0,0 +1,74 @@
+import math
+import time
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows
+    resource = None
+
+
+# ==============================
+# PERCENTILES
+# ==============================
+
+def percentile(values, pct):
+
+    if not values:
+        return 0.0
+
+    ordered = sorted(values)
+
+    # Nearest-rank percentile
+    rank = math.ceil(pct / 100 * len(ordered))
+    rank = min(max(rank, 1), len(ordered))
+
+    return ordered[rank - 1]
+
+
+# ==============================
+# LATENCY SUMMARY
+# ==============================
+
+def log_latency_summary(label, latencies):
+
+    if not latencies:
+        print(f"{label} latency: no samples")
+        return
+
+    print(
+        f"{label} latency over {len(latencies)} requests: "
+        f"p50={percentile(latencies, 50):.2f}s "
+        f"p90={percentile(latencies, 90):.2f}s "
+        f"p99={percentile(latencies, 99):.2f}s "
+        f"max={max(latencies):.2f}s"
+    )
+
+
+# ==============================
+# CPU TIME AND PEAK MEMORY
+# ==============================
+
+def log_resource_usage(label, wall_start=None):
+
+    parts = []
+
+    if wall_start is not None:
+        parts.append(f"wall={time.monotonic() - wall_start:.2f}s")
+
+    if resource is None:
+        parts.append(f"cpu={time.process_time():.2f}s")
+        print(f"{label}: " + " ".join(parts))
+        return
+
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+    # Children covers ffmpeg / dot subprocesses
+    cpu = own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+    parts.append(f"cpu={cpu:.2f}s")
+    parts.append(f"peak_rss={own.ru_maxrss / 1024:.0f}MB")
+    parts.append(f"child_peak_rss={children.ru_maxrss / 1024:.0f}MB")
+
+    print(f"{label}: " + " ".join(parts))
@@ -0,0 +1,57 @@
+import os
+
+
+# ==============================
+# NAMED RENDER PROFILES
+# ==============================
+
+# Shared by image ingest, diagram rendering and the video encoder.
+# preview trades quality for encode speed while iterating on a topic.
+PROFILES = {
+    "preview": {"size": (854, 480), "preset": "ultrafast", "crf": 30, "audio_bitrate": "96k"},
+    "720p": {"size": (1280, 720), "preset": "medium", "crf": 21, "audio_bitrate": "192k"},
+    "1080p": {"size": (1920, 1080), "preset": "medium", "crf": 21, "audio_bitrate": "192k"},
+}
+
+# "final" is the full-quality output at the default resolution
+ALIASES = {"final": "720p"}
+
+DEFAULT_PROFILE = "720p"
+
+# Layout below was designed at this height and is scaled from it
+REFERENCE_HEIGHT = 720
+
+
+def get_profile_name():
+
+    name = os.environ.get("RENDER_PROFILE", DEFAULT_PROFILE)
+    name = ALIASES.get(name, name)
+
+    if name not in PROFILES:
+        raise ValueError(f"Unknown render profile: {name}")
+
+    return name
+
+
+def get_profile():
+    return PROFILES[get_profile_name()]
+
+
+def get_output_size():
+
+    # RENDER_SIZE=WxH still overrides the profile for one-off sizes
+    value = os.environ.get("RENDER_SIZE")
+
+    if value:
+        width, height = value.lower().split("x")
+        return int(width), int(height)
+
+    return PROFILES[get_profile_name()]["size"]
+
+
+def scaled(pixels, size=None):
+
+    # Scale a length designed for 720p to the current output height
+    size = size or get_output_size()
+
+    return max(1, round(pixels * size[1] / REFERENCE_HEIGHT))
@@ -0,0 +1,130 @@
+import os
+import shutil
+import threading
+from functools import lru_cache
+
+from PIL import ImageFont
+
+
+# ==============================
+# FONTS
+# ==============================
+
+# FONT_PATH overrides; otherwise the first font that exists wins
+FONT_CANDIDATES = [
+    "C:/Windows/Fonts/arial.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf",
+    "/usr/share/fonts/liberation-sans/LiberationSans-Regular.ttf",
+    "/usr/share/fonts/TTF/DejaVuSans.ttf",
+    "/Library/Fonts/Arial.ttf",
+    "/System/Library/Fonts/Supplemental/Arial.ttf",
+    # Resolved by FreeType against the system font folders
+    "arial.ttf",
+    "DejaVuSans.ttf",
+]
+
+
+@lru_cache(maxsize=None)
+def find_font():
+
+    override = os.environ.get("FONT_PATH")
+
+    for path in ([override] if override else []) + FONT_CANDIDATES:
+        try:
+            ImageFont.truetype(path, 12)
+        except OSError:
+            continue
+        return path
+
+    print("No TrueType font found, using Pillow's built-in font")
+
+    return None
+
+
+_font_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def _load_font(path, size):
+
+    if path is None:
+        try:
+            return ImageFont.load_default(size)
+        except TypeError:
+            # Pillow < 10.1 has a single fixed-size bitmap font
+            return ImageFont.load_default()
+
+    return ImageFont.truetype(path, size)
+
+
+def load_font(size):
+
+    # One ImageFont per size per process, shared by every renderer
+    with _font_lock:
+        return _load_font(find_font(), size)
+
+
+def wrap_text(draw, text, font, max_width):
+
+    # Greedy word wrap by rendered width; a single overlong word keeps its line
+    lines = []
+    current = ""
+
+    for word in text.split():
+
+        candidate = (current + " " + word).strip()
+
+        if draw.textlength(candidate, font=font) <= max_width or not current:
+            current = candidate
+        else:
+            lines.append(current)
+            current = word
+
+    if current:
+        lines.append(current)
+
+    return lines
+
+
+# ==============================
+# FFMPEG
+# ==============================
+
+WINDOWS_FFMPEG = r"C:\ffmpeg-8.0.1-essentials_build\bin\ffmpeg.exe"
+
+
+@lru_cache(maxsize=None)
+def find_ffmpeg():
+
+    # Explicit setting, then PATH, then the bundled imageio-ffmpeg binary
+    for name in ("FFMPEG_BINARY", "IMAGEIO_FFMPEG_EXE"):
+        path = os.environ.get(name)
+        if path and os.path.exists(path):
+            return path
+
+    path = shutil.which("ffmpeg")
+
+    if path:
+        return path
+
+    if os.path.exists(WINDOWS_FFMPEG):
+        return WINDOWS_FFMPEG
+
+    # imageio-ffmpeg returns IMAGEIO_FFMPEG_EXE unchecked, so drop a stale one
+    os.environ.pop("IMAGEIO_FFMPEG_EXE", None)
+
+    import imageio_ffmpeg
+
+    return imageio_ffmpeg.get_ffmpeg_exe()
+
+
+def use_ffmpeg():
+
+    # moviepy reads IMAGEIO_FFMPEG_EXE when it is first imported
+    path = find_ffmpeg()
+
+    os.environ["IMAGEIO_FFMPEG_EXE"] = path
+
+    return path
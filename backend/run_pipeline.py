@@ -2,6 +2,8 @@ import os
 import sys
 import subprocess
 import re
+import argparse
+import threading
 
 # Force immediate stdout flush
 sys.stdout.reconfigure(line_buffering=True)
@@ -43,10 +45,27 @@ def is_valid_query(query):
 # RUN PIPELINE STEP
 # ==============================
 
-def run_step(stage, message, command):
+# Steps started in the background, stopped if another step fails
+background_steps = []
+
+
+def stream_output(process):
+
+    # Stream subprocess output
+    while True:
+
+        line = process.stdout.readline()
+
+        if not line:
+            break
+
+        line = line.strip()
+
+        if line:
+            print(line, flush=True)
 
-    # Stage marker used by Flask
-    print(f"STAGE: {stage}", flush=True)
+
+def start_step(message, command):
 
     log(message)
 
@@ -60,26 +79,36 @@ def run_step(stage, message, command):
         universal_newlines=True
     )
 
-    # Stream subprocess output
-    while True:
+    reader = threading.Thread(target=stream_output, args=(process,), daemon=True)
+    reader.start()
 
-        line = process.stdout.readline()
+    return process, reader
 
-        if not line:
-            break
 
-        line = line.strip()
-
-        if line:
-            print(line, flush=True)
+def finish_step(stage, process, reader):
 
     process.wait()
+    reader.join()
 
     if process.returncode != 0:
+
         log(f"ERROR: {stage} FAILED")
+
+        for other, _ in background_steps:
+            if other.poll() is None:
+                other.terminate()
+
         sys.exit(1)
 
 
+def run_step(stage, message, command):
+
+    # Stage marker used by Flask
+    print(f"STAGE: {stage}", flush=True)
+
+    finish_step(stage, *start_step(message, command))
+
+
 # ==============================
 # START PIPELINE
 # ==============================
@@ -88,7 +117,67 @@ log("\n===================================")
 log("PROJECT -> VIDEO PIPELINE STARTED")
 log("===================================\n")
 
-query = " ".join(sys.argv[1:]) if len(sys.argv) > 1 else ""
+parser = argparse.ArgumentParser(description="Project -> video pipeline")
+
+parser.add_argument("query", nargs="*")
+
+parser.add_argument(
+    "--image-backend",
+    choices=["auto", "remote", "local"],
+    default=os.environ.get("IMAGE_BACKEND", "auto"),
+    help="auto tries the remote generator and falls back to local rendering"
+)
+
+parser.add_argument(
+    "--tts-backend",
+    choices=["edge", "local", "tone"],
+    default=os.environ.get("TTS_BACKEND", "edge"),
+    help="edge needs network, local uses espeak, tone is for benchmarks"
+)
+
+parser.add_argument(
+    "--profile",
+    "--render-profile",
+    dest="profile",
+    choices=["preview", "final", "720p", "1080p"],
+    default=os.environ.get("RENDER_PROFILE", "720p"),
+    help="preview is 480p and fast to encode; final / 720p / 1080p are full quality"
+)
+
+parser.add_argument(
+    "--subtitles",
+    choices=["burn", "soft", "both"],
+    default=os.environ.get("SUBTITLE_MODE", "burn"),
+    help="burn draws captions into the video, soft adds a selectable text track"
+)
+
+parser.add_argument(
+    "--tts-batch",
+    action="store_true",
+    help="synthesize all scenes in one TTS request after the storyboard"
+)
+
+parser.add_argument(
+    "--stream",
+    action="store_true",
+    help="publish each rendered scene to an HLS playlist (used by the web app)"
+)
+
+args = parser.parse_args()
+
+query = " ".join(args.query)
+
+# Per-job options reach the stage scripts through the environment
+os.environ["IMAGE_BACKEND"] = args.image_backend
+os.environ["TTS_BACKEND"] = args.tts_backend
+os.environ["RENDER_PROFILE"] = args.profile
+os.environ["SUBTITLE_MODE"] = args.subtitles
+
+if args.tts_batch:
+    os.environ["TTS_BATCH"] = "1"
+
+if args.stream:
+    os.environ["STREAM_OUTPUT"] = "1"
 
 # Validate query
 if not is_valid_query(query):
@@ -103,6 +192,8 @@ if not is_valid_query(query):
 
 
 log(f"Project Topic: {query}")
+log(f"Image Backend: {args.image_backend}")
+log(f"TTS Backend: {args.tts_backend}")
 
 BACKEND = "backend"
 
@@ -119,9 +210,28 @@ run_step(
 
 
 # ==============================
-# STEP 2 — STORYBOARD
+# STEP 2 — STORYBOARD (+ AUDIO IN PARALLEL)
 # ==============================
 
+# Drop the previous job's stream so the audio step cannot replay it
+NARRATION_STREAM = os.path.join("data", "narration_stream.jsonl")
+
+if os.path.exists(NARRATION_STREAM):
+    os.remove(NARRATION_STREAM)
+
+# Audio follows the storyboard scene by scene instead of waiting for it.
+# Batched TTS needs every scene up front, so it runs after the storyboard.
+audio_command = f"python -u {BACKEND}/audio_generator.py"
+
+if not args.tts_batch:
+
+    audio_step = start_step(
+        "Starting narration audio alongside the storyboard...",
+        audio_command + " --follow"
+    )
+
+    background_steps.append(audio_step)
+
 run_step(
     "STORYBOARD",
     "Generating storyboard...",
@@ -144,11 +254,17 @@ run_step(
 # STEP 4 — AUDIO
 # ==============================
 
-run_step(
-    "AUDIO",
-    "Generating audio...",
-    f"python -u {BACKEND}/audio_generator.py"
-)
+if args.tts_batch:
+
+    run_step("AUDIO", "Generating audio in one batched request...", audio_command)
+
+else:
+
+    print("STAGE: AUDIO", flush=True)
+
+    log("Waiting for narration audio...")
+
+    finish_step("AUDIO", *audio_step)
 
 
 # ==============================
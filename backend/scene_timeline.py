@@ -0,0 +1,56 @@
+import bisect
+
+from moviepy.editor import VideoClip
+
+
+# ==============================
+# LAZY SCENE TIMELINE
+# ==============================
+
+class LazySceneTimeline:
+
+    # Only the scene being rendered is held in memory. load_frame(i) returns
+    # scene i's finished frame as an array; moviepy asks for frames in order,
+    # so each scene is loaded once and dropped as soon as the next one starts
+
+    def __init__(self, timeline, fps, load_frame):
+
+        self.fps = fps
+        self.load_frame = load_frame
+
+        # Scenes are placed on the frame grid (first_frame, frames)
+        self.starts = [scene["first_frame"] for scene in timeline]
+        self.total_frames = sum(scene["frames"] for scene in timeline)
+
+        self.index = None
+        self.frame = None
+        self.loads = 0
+
+    def scene_at(self, t):
+
+        frame = min(int(t * self.fps + 1e-6), self.total_frames - 1)
+
+        return bisect.bisect_right(self.starts, frame) - 1
+
+    def make_frame(self, t):
+
+        index = self.scene_at(t)
+
+        if index != self.index:
+
+            # Release the previous scene before decoding the next one
+            self.frame = None
+            self.frame = self.load_frame(index)
+
+            self.index = index
+            self.loads += 1
+
+        return self.frame
+
+    def close(self):
+
+        self.index = None
+        self.frame = None
+
+    def clip(self):
+        return VideoClip(self.make_frame, duration=self.total_frames / self.fps)
@@ -0,0 +1,43 @@
+import os
+
+from file_cache import FileCache, file_digest, make_key
+
+
+# ==============================
+# SETTINGS
+# ==============================
+
+CACHE_FOLDER = os.path.join("cache", "segments")
+
+CACHE_MAX_MB = float(os.environ.get("SEGMENT_CACHE_MAX_MB", "1000"))
+
+
+# ==============================
+# ENCODED SCENE SEGMENTS
+# ==============================
+
+class SegmentCache:
+
+    def __init__(self, folder=CACHE_FOLDER, max_mb=CACHE_MAX_MB):
+        self.files = FileCache(folder, int(max_mb * 1024 * 1024), extension=".mp4")
+
+    def key_for(self, image_path, subtitle, frames, profile, size, version):
+
+        # Content hashes, so a regenerated but identical image still hits
+        return make_key(
+            file_digest(image_path),
+            subtitle,
+            frames,
+            profile,
+            list(size),
+            version
+        )
+
+    def fetch(self, key, dest):
+        return self.files.copy_to(key, dest)
+
+    def store(self, key, path):
+        self.files.put(key, path)
+
+    def log_stats(self):
+        self.files.log_stats("Segment")
@@ -0,0 +1,180 @@
+import os
+import subprocess
+
+from PIL import Image
+
+from audio_timeline import pcm_input_args
+from render_resources import find_ffmpeg
+
+
+# ==============================
+# SETTINGS
+# ==============================
+
+FPS = 24
+
+# The still is decoded once per second of input and duplicated up to FPS,
+# instead of ffmpeg re-decoding the PNG for every output frame
+STILL_INPUT_FPS = 1
+
+# One still frame and one encoded segment per scene
+SEGMENT_FOLDER = "segments"
+
+# Bump when frame composition or encode arguments change, so cached
+# segments from older code are not reused
+ENCODER_VERSION = 2
+
+def video_codec_args(profile):
+
+    return [
+        "-c:v", "libx264",
+        "-preset", profile["preset"],
+        "-crf", str(profile["crf"]),
+        "-tune", "stillimage",
+        "-pix_fmt", "yuv420p",
+        # ffmpeg's default for 24 fps, pinned so every segment shares a timebase
+        "-video_track_timescale", "12288"
+    ]
+
+
+def audio_codec_args(profile):
+
+    # The whole PCM timeline is encoded in one pass with these settings
+    return [
+        "-c:a", "aac",
+        "-b:a", profile["audio_bitrate"],
+        "-ar", "48000",
+        "-ac", "2"
+    ]
+
+
+def run_ffmpeg(args, input=None):
+
+    # input is written to ffmpeg's stdin (raw PCM for "-i pipe:0")
+    result = subprocess.run(
+        [find_ffmpeg(), "-hide_banner", "-loglevel", "error", "-y"] + args,
+        input=input,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE
+    )
+
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed: {result.stderr.decode(errors='ignore').strip()}")
+
+
+# ==============================
+# BAKE SUBTITLE INTO THE STILL
+# ==============================
+
+def composite_still(image_path, subtitle, subtitle_y, size):
+
+    # subtitle is an RGBA strip, composited once instead of once per frame
+    with Image.open(image_path) as img:
+
+        frame = img.convert("RGBA")
+
+    if frame.size != size:
+        print("Resizing at render time:", image_path)
+        frame = frame.resize(size, Image.LANCZOS)
+
+    if subtitle is not None:
+        frame.alpha_composite(subtitle, ((size[0] - subtitle.width) // 2, subtitle_y))
+
+    return frame.convert("RGB")
+
+
+def compose_frame(image_path, subtitle, subtitle_y, size, frame_path):
+
+    # Soft subtitles and an image already at output size: encode as is
+    if subtitle is None:
+        with Image.open(image_path) as img:
+            if img.size == size:
+                return image_path
+
+    composite_still(image_path, subtitle, subtitle_y, size).save(frame_path, format="PNG", compress_level=1)
+
+    return frame_path
+
+
+# ==============================
+# ENCODE ONE SCENE
+# ==============================
+
+def encode_still_segment(frame_path, frames, segment_path, profile, threads=0):
+
+    # Video only: the soundtrack is assembled separately and muxed once
+    args = ["-loop", "1", "-framerate", str(STILL_INPUT_FPS), "-i", frame_path]
+    args += ["-map", "0:v"]
+    args += video_codec_args(profile) + ["-r", str(FPS), "-threads", str(threads)]
+
+    # An exact frame count keeps every scene on the shared frame grid
+    args += ["-frames:v", str(frames), segment_path]
+
+    run_ffmpeg(args)
+
+    return segment_path
+
+
+# ==============================
+# JOIN SEGMENTS
+# ==============================
+
+def concat_segments(segment_paths, output_path, audio=None, profile=None):
+
+    list_path = os.path.join(os.path.dirname(segment_paths[0]), "segments.txt")
+
+    with open(list_path, "w", encoding="utf-8") as f:
+        for path in segment_paths:
+            f.write(f"file '{os.path.abspath(path)}'\n")
+
+    # Video by stream copy: joining costs a file copy, not a re-encode
+    inputs = ["-f", "concat", "-safe", "0", "-i", list_path]
+
+    if audio is None:
+        run_ffmpeg(inputs + ["-c", "copy", "-movflags", "+faststart", output_path])
+        return output_path
+
+    return mux_audio(inputs, audio, output_path, profile)
+
+
+# ==============================
+# ADD THE SOUNDTRACK
+# ==============================
+
+def mux_audio(video_inputs, audio, output_path, profile):
+
+    # Copies the video and encodes the PCM timeline to AAC in the same pass
+    args = video_inputs + pcm_input_args()
+    args += ["-map", "0:v", "-map", "1:a", "-c:v", "copy"]
+    args += audio_codec_args(profile)
+    args += ["-movflags", "+faststart", output_path]
+
+    run_ffmpeg(args, input=audio.tobytes())
+
+    return output_path
+
+
+# ==============================
+# SOFT SUBTITLE TRACK
+# ==============================
+
+def add_subtitle_track(video_path, srt_path):
+
+    temp_path = video_path + ".tmp.mp4"
+
+    # Streams are copied; only the timed text is converted to mov_text
+    run_ffmpeg([
+        "-i", video_path,
+        "-i", srt_path,
+        "-map", "0",
+        "-map", "1",
+        "-c", "copy",
+        "-c:s", "mov_text",
+        "-metadata:s:s:0", "language=eng",
+        "-movflags", "+faststart",
+        temp_path
+    ])
+
+    os.replace(temp_path, video_path)
+
+    return video_path
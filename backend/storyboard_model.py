@@ -1,45 +1,42 @@
 import re
 
+try:
+    from keyword_matcher import KeywordMatcher
+except ImportError:
+    # Imported as backend.storyboard_model from the project root
+    from backend.keyword_matcher import KeywordMatcher
 
-# ---------- Extract important words ----------
-def extract_keywords(text):
-    words = text.lower().split()
-
-    important = []
 
-    tech_words = [
-        "ai","machine learning","sensor","data","analytics",
-        "traffic","health","prediction","monitoring",
-        "detection","system","analysis","automation",
-        "network","security","blockchain","database"
-    ]
+TECH_WORDS = [
+    "ai","machine learning","sensor","data","analytics",
+    "traffic","health","prediction","monitoring",
+    "detection","system","analysis","automation",
+    "network","security","blockchain","database"
+]
 
-    for word in words:
-        if word in tech_words:
-            important.append(word)
+COMPONENT_KEYWORDS = {
+    "ai": "AI Engine",
+    "sensor": "Sensors",
+    "data": "Data Processing Module",
+    "database": "Database",
+    "app": "Frontend Application",
+}
 
-    return list(set(important))
+KEYWORD_MATCHER = KeywordMatcher(TECH_WORDS)
+COMPONENT_MATCHER = KeywordMatcher(COMPONENT_KEYWORDS, plurals=True)
 
 
-# ---------- Extract components ----------
-def detect_components(text):
-
-    components = []
-
-    if "ai" in text.lower():
-        components.append("AI Engine")
+# ---------- Extract important words ----------
+def extract_keywords(text):
 
-    if "sensor" in text.lower():
-        components.append("Sensors")
+    # Multi-word entries such as "machine learning" now match as well
+    return list(set(KEYWORD_MATCHER.present(text)))
 
-    if "data" in text.lower():
-        components.append("Data Processing Module")
 
-    if "database" in text.lower():
-        components.append("Database")
+# ---------- Extract components ----------
+def detect_components(text):
 
-    if "app" in text.lower():
-        components.append("Frontend Application")
+    components = [COMPONENT_KEYWORDS[key] for key in COMPONENT_MATCHER.present(text)]
 
     if len(components) == 0:
         components.append("Processing System")
@@ -0,0 +1,110 @@
+from tts_backends import estimate_word_timings
+
+
+# ==============================
+# SETTINGS
+# ==============================
+
+# Longest caption shown at once; longer narration is split across cues
+CUE_MAX_WORDS = 12
+
+
+# ==============================
+# BUILD CUES FROM THE TIMELINE
+# ==============================
+
+def scene_word_timings(text, duration, words):
+
+    # Engine word timings only line up when they cover the same words
+    if words and len(words) == len(text.split()):
+        return words
+
+    return estimate_word_timings(text, duration)
+
+
+def build_cues(timeline, subtitles):
+
+    # timeline entries carry start, duration and (optionally) words
+    cues = []
+
+    for i, scene in enumerate(timeline):
+
+        text = subtitles[i] if i < len(subtitles) else ""
+
+        if not text.strip():
+            continue
+
+        words = scene_word_timings(text, scene["duration"], scene.get("words"))
+        tokens = text.split()
+
+        for first in range(0, len(tokens), CUE_MAX_WORDS):
+
+            last = min(first + CUE_MAX_WORDS, len(tokens)) - 1
+
+            start = scene["start"] + words[first]["start"]
+
+            # Hold each caption until the next one (or the end of the scene)
+            if last + 1 < len(tokens):
+                end = scene["start"] + words[last + 1]["start"]
+            else:
+                end = scene["start"] + scene["duration"]
+
+            cues.append({
+                "start": start,
+                "end": max(end, start + 0.1),
+                "text": " ".join(tokens[first:last + 1])
+            })
+
+    return cues
+
+
+# ==============================
+# SRT / WEBVTT
+# ==============================
+
+def format_timestamp(seconds, separator):
+
+    millis = int(round(seconds * 1000))
+    hours, millis = divmod(millis, 3600000)
+    minutes, millis = divmod(millis, 60000)
+    secs, millis = divmod(millis, 1000)
+
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{millis:03d}"
+
+
+def format_srt(cues):
+
+    blocks = []
+
+    for number, cue in enumerate(cues, start=1):
+        blocks.append(
+            f"{number}\n"
+            f"{format_timestamp(cue['start'], ',')} --> {format_timestamp(cue['end'], ',')}\n"
+            f"{cue['text']}\n"
+        )
+
+    return "\n".join(blocks)
+
+
+def format_vtt(cues):
+
+    blocks = ["WEBVTT\n"]
+
+    for cue in cues:
+        blocks.append(
+            f"{format_timestamp(cue['start'], '.')} --> {format_timestamp(cue['end'], '.')}\n"
+            f"{cue['text']}\n"
+        )
+
+    return "\n".join(blocks)
+
+
+def write_subtitle_files(cues, srt_path, vtt_path):
+
+    with open(srt_path, "w", encoding="utf-8") as f:
+        f.write(format_srt(cues))
+
+    with open(vtt_path, "w", encoding="utf-8") as f:
+        f.write(format_vtt(cues))
+
+    print(f"Saved {len(cues)} subtitle cues: {srt_path}, {vtt_path}")
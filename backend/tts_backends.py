@@ -0,0 +1,441 @@
+import os
+import math
+import wave
+import array
+import bisect
+import shutil
+import asyncio
+
+
+# ==============================
+# SETTINGS
+# ==============================
+
+EDGE_VOICE = "en-IN-PrabhatNeural"
+EDGE_RATE = "-10%"
+EDGE_PITCH = "+0Hz"
+
+# espeak-ng / espeak voice for offline synthesis
+LOCAL_VOICE = os.environ.get("TTS_LOCAL_VOICE", "en-us")
+
+# espeak default speaking speed, scaled by the same rate as edge-tts
+LOCAL_BASE_WPM = 175
+
+# Speaking speed assumed by the tone backend to size its output
+TONE_WORDS_PER_SECOND = 2.5
+TONE_SAMPLE_RATE = 16000
+
+# Silence kept around each scene's words when a batched request is cut
+# apart, instead of splitting the whole pause between neighbouring scenes
+BATCH_LEAD_SECONDS = 0.1
+BATCH_TAIL_SECONDS = 0.4
+
+
+def rate_factor(rate):
+
+    # "-10%" -> 0.9
+    return 1 + int(rate.rstrip("%")) / 100
+
+
+def write_file(path, data):
+
+    # Output paths may be hard links into the audio cache: write a new file
+    # and swap it in, never truncate the linked inode in place
+    temp_path = path + ".tmp"
+
+    with open(temp_path, "wb") as f:
+        f.write(data)
+
+    os.replace(temp_path, path)
+
+
+def wav_duration(path):
+
+    with wave.open(path, "rb") as f:
+        return f.getnframes() / f.getframerate()
+
+
+def estimate_word_timings(text, duration):
+
+    # Engines without word events: spread words by length over the clip
+    words = text.split()
+    total = sum(len(w) + 1 for w in words) or 1
+
+    timings = []
+    start = 0.0
+
+    for word in words:
+        end = start + duration * (len(word) + 1) / total
+        timings.append({"text": word, "start": round(start, 3), "end": round(end, 3)})
+        start = end
+
+    return timings
+
+
+# edge-tts reports offsets in 100 ns ticks
+TICKS_PER_SECOND = 10_000_000
+
+
+# ==============================
+# MP3 FRAME SCANNING
+# ==============================
+
+MP3_BITRATES = {
+    "1": [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    "2": [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+
+MP3_SAMPLE_RATES = {
+    3: [44100, 48000, 32000],   # MPEG-1
+    2: [22050, 24000, 16000],   # MPEG-2
+    0: [11025, 12000, 8000],    # MPEG-2.5
+}
+
+
+def mp3_frames(data):
+
+    # (byte offset, start time in seconds) of every Layer III frame
+    frames = []
+    position = 0
+    elapsed = 0.0
+
+    while position + 4 <= len(data):
+
+        b1, b2, b3 = data[position], data[position + 1], data[position + 2]
+
+        version = (b2 >> 3) & 3
+        layer = (b2 >> 1) & 3
+        bitrate_index = b3 >> 4
+        rate_index = (b3 >> 2) & 3
+
+        if (b1 != 0xFF or (b2 & 0xE0) != 0xE0 or layer != 1 or version == 1
+                or bitrate_index in (0, 15) or rate_index == 3):
+            # Not a frame header: resync on the next byte
+            position += 1
+            continue
+
+        table = MP3_BITRATES["1" if version == 3 else "2"]
+        bitrate = table[bitrate_index] * 1000
+        sample_rate = MP3_SAMPLE_RATES[version][rate_index]
+        padding = (b3 >> 1) & 1
+
+        if version == 3:
+            length = 144 * bitrate // sample_rate + padding
+            samples = 1152
+        else:
+            length = 72 * bitrate // sample_rate + padding
+            samples = 576
+
+        frames.append((position, elapsed))
+
+        position += length
+        elapsed += samples / sample_rate
+
+    return frames
+
+
+def split_offset(frames, seconds, total_bytes):
+
+    # Byte offset of the frame boundary closest to the requested time
+    if not frames:
+        return total_bytes
+
+    times = [t for _, t in frames]
+    index = bisect.bisect_left(times, seconds)
+
+    if index >= len(frames):
+        return total_bytes
+
+    if index > 0 and seconds - times[index - 1] < times[index] - seconds:
+        index -= 1
+
+    return frames[index][0]
+
+
+# ==============================
+# EDGE TTS (NETWORK)
+# ==============================
+
+class EdgeTTSBackend:
+
+    name = "edge"
+    extension = ".mp3"
+    cacheable = True
+
+    # 48 kbps constant bitrate, so duration follows from size
+    output_format = "audio-24khz-48kbitrate-mono-mp3"
+    bytes_per_second = 48000 // 8
+
+    def __init__(self, voice=EDGE_VOICE, rate=EDGE_RATE, pitch=EDGE_PITCH):
+
+        self.voice = voice
+        self.rate = rate
+        self.pitch = pitch
+
+    def cache_params(self):
+        return (self.voice, self.rate, self.pitch, self.output_format)
+
+    def batch_cache_params(self):
+
+        # Pieces cut from one request differ slightly from per-scene audio
+        # (sentence punctuation, trimmed silence), so they are cached apart
+        return (self.voice, self.rate, self.pitch, self.output_format + ":batch")
+
+    def communicate(self, text):
+
+        import edge_tts
+
+        try:
+            # edge-tts 7 sends sentence events unless asked for words
+            return edge_tts.Communicate(
+                text,
+                self.voice,
+                rate=self.rate,
+                pitch=self.pitch,
+                boundary="WordBoundary"
+            )
+        except TypeError:
+            # Older edge-tts always sends WordBoundary events
+            return edge_tts.Communicate(
+                text,
+                self.voice,
+                rate=self.rate,
+                pitch=self.pitch
+            )
+
+    async def synthesize(self, text, path):
+
+        audio = bytearray()
+        words = []
+
+        async for chunk in self.communicate(text).stream():
+
+            if chunk["type"] == "audio":
+                audio.extend(chunk["data"])
+
+            elif chunk["type"] == "WordBoundary":
+                start = chunk["offset"] / TICKS_PER_SECOND
+                end = (chunk["offset"] + chunk["duration"]) / TICKS_PER_SECOND
+                words.append({"text": chunk["text"], "start": round(start, 3), "end": round(end, 3)})
+
+        write_file(path, audio)
+
+        return {"duration": len(audio) / self.bytes_per_second, "words": words}
+
+    async def synthesize_batch(self, texts, paths):
+
+        # One request for every scene, cut apart afterwards at word boundaries.
+        # Each part ends a sentence so there is a pause to cut in
+        parts = [t.strip() if t.strip()[-1:] in ".!?" else t.strip() + "." for t in texts]
+
+        combined = ""
+        scene_starts = []
+
+        for part in parts:
+            scene_starts.append(len(combined))
+            combined += part + "\n\n"
+
+        audio = bytearray()
+        words = []
+
+        async for chunk in self.communicate(combined).stream():
+
+            if chunk["type"] == "audio":
+                audio.extend(chunk["data"])
+
+            elif chunk["type"] == "WordBoundary":
+                words.append(chunk)
+
+        # Assign every word event to a scene by locating it in the combined text
+        scene_words = [[] for _ in parts]
+        cursor = 0
+
+        for event in words:
+
+            found = combined.find(event["text"], cursor)
+
+            if found >= 0:
+                cursor = found + len(event["text"])
+
+            scene = max(0, bisect.bisect_right(scene_starts, cursor - 1) - 1)
+
+            scene_words[scene].append({
+                "text": event["text"],
+                "start": event["offset"] / TICKS_PER_SECOND,
+                "end": (event["offset"] + event["duration"]) / TICKS_PER_SECOND
+            })
+
+        # Scenes never overlap past the middle of the pause between them
+        frames = mp3_frames(audio)
+        limits = [0]
+
+        for i in range(1, len(parts)):
+
+            previous = next((w[-1]["end"] for w in reversed(scene_words[:i]) if w), 0.0)
+            following = next((w[0]["start"] for w in scene_words[i:] if w), previous)
+
+            cut = split_offset(frames, (previous + following) / 2, len(audio))
+            limits.append(max(cut, limits[-1]))
+
+        limits.append(len(audio))
+
+        results = []
+
+        for i, path in enumerate(paths):
+
+            start, end = limits[i], limits[i + 1]
+
+            # Trim to the scene's own words plus a fixed lead and tail, like
+            # the silence around a scene synthesized on its own
+            if scene_words[i]:
+
+                lead = split_offset(frames, scene_words[i][0]["start"] - BATCH_LEAD_SECONDS, len(audio))
+                tail = split_offset(frames, scene_words[i][-1]["end"] + BATCH_TAIL_SECONDS, len(audio))
+
+                start = min(max(start, lead), end)
+                end = max(min(end, tail), start)
+
+            segment = audio[start:end]
+            offset = start / self.bytes_per_second
+
+            write_file(path, segment)
+
+            results.append({
+                "duration": len(segment) / self.bytes_per_second,
+                "words": [
+                    {
+                        "text": w["text"],
+                        "start": round(w["start"] - offset, 3),
+                        "end": round(w["end"] - offset, 3)
+                    }
+                    for w in scene_words[i]
+                ]
+            })
+
+        return results
+
+
+# ==============================
+# LOCAL ESPEAK (OFFLINE, CPU)
+# ==============================
+
+class LocalTTSBackend:
+
+    name = "local"
+    extension = ".wav"
+    cacheable = True
+    output_format = "espeak-wav"
+
+    def __init__(self, voice=LOCAL_VOICE, rate=EDGE_RATE):
+
+        self.voice = voice
+        self.rate = rate
+        self.binary = shutil.which("espeak-ng") or shutil.which("espeak")
+
+        if self.binary is None:
+            raise RuntimeError("Local TTS needs espeak-ng or espeak on PATH")
+
+        self.pitch = "50"
+        self.wpm = int(LOCAL_BASE_WPM * rate_factor(rate))
+
+    def cache_params(self):
+        return (f"{self.name}:{self.voice}", self.rate, self.pitch, self.output_format)
+
+    async def synthesize(self, text, path):
+
+        # Written beside the output and swapped in (see write_file)
+        temp_path = path + ".tmp"
+
+        # One process per scene, so scenes render in parallel on all cores
+        process = await asyncio.create_subprocess_exec(
+            self.binary,
+            "-v", self.voice,
+            "-s", str(self.wpm),
+            "-p", self.pitch,
+            "-w", temp_path,
+            text,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE
+        )
+
+        _, stderr = await process.communicate()
+
+        if process.returncode != 0:
+            raise RuntimeError(f"espeak failed: {stderr.decode(errors='ignore').strip()}")
+
+        duration = wav_duration(temp_path)
+
+        os.replace(temp_path, path)
+
+        return {"duration": duration, "words": estimate_word_timings(text, duration)}
+
+
+# ==============================
+# TONE / SILENCE (BENCHMARKS)
+# ==============================
+
+class ToneTTSBackend:
+
+    name = "tone"
+    extension = ".wav"
+    cacheable = False
+    output_format = "tone-wav"
+
+    def __init__(self, frequency=None):
+
+        # TTS_TONE_HZ=0 writes silence instead of a tone
+        if frequency is None:
+            frequency = float(os.environ.get("TTS_TONE_HZ", "440"))
+
+        self.frequency = frequency
+
+    def cache_params(self):
+        return (self.name, str(self.frequency), "", self.output_format)
+
+    def duration_for(self, text):
+        return max(1.0, len(text.split()) / TONE_WORDS_PER_SECOND)
+
+    async def synthesize(self, text, path):
+
+        duration = self.duration_for(text)
+        frames = int(duration * TONE_SAMPLE_RATE)
+
+        if self.frequency > 0:
+            step = 2 * math.pi * self.frequency / TONE_SAMPLE_RATE
+            samples = array.array("h", (int(3000 * math.sin(step * n)) for n in range(frames)))
+        else:
+            samples = array.array("h", bytes(2 * frames))
+
+        temp_path = path + ".tmp"
+
+        with wave.open(temp_path, "wb") as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(TONE_SAMPLE_RATE)
+            f.writeframes(samples.tobytes())
+
+        os.replace(temp_path, path)
+
+        duration = frames / TONE_SAMPLE_RATE
+
+        return {"duration": duration, "words": estimate_word_timings(text, duration)}
+
+
+# ==============================
+# BACKEND SELECTION
+# ==============================
+
+def get_tts_backend(name=None):
+
+    name = (name or os.environ.get("TTS_BACKEND", "edge")).lower()
+
+    if name == "edge":
+        return EdgeTTSBackend()
+
+    if name == "local":
+        return LocalTTSBackend()
+
+    if name == "tone":
+        return ToneTTSBackend()
+
+    raise ValueError(f"Unknown TTS backend: {name}")
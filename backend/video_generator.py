@@ -1,16 +1,43 @@
 import os
 import re
+import json
+import time
 import numpy as np
 import textwrap
-from PIL import Image, ImageDraw, ImageFont
-
-# Force FFmpeg
-os.environ["IMAGEIO_FFMPEG_EXE"] = r"C:\ffmpeg-8.0.1-essentials_build\bin\ffmpeg.exe"
-
-from moviepy.editor import ImageClip, AudioFileClip, CompositeVideoClip, concatenate_videoclips
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from PIL import Image, ImageDraw
+
+from render_resources import find_font, load_font, use_ffmpeg
+
+# Resolve ffmpeg (PATH, Windows build or imageio-ffmpeg) before moviepy loads
+print("FFmpeg:", use_ffmpeg())
+
+from moviepy.editor import AudioFileClip
+
+from audio_timeline import build_audio_timeline, timeline_slice
+from hls_stream import STREAM_FOLDER, HlsPlaylist
+from pipeline_metrics import log_resource_usage
+from render_profiles import get_output_size, get_profile, get_profile_name, scaled
+from scene_timeline import LazySceneTimeline
+from segment_cache import SegmentCache
+from still_renderer import (
+    ENCODER_VERSION,
+    FPS,
+    SEGMENT_FOLDER,
+    add_subtitle_track,
+    composite_still,
+    compose_frame,
+    concat_segments,
+    encode_still_segment,
+    mux_audio
+)
+from subtitle_tracks import build_cues, write_subtitle_files
 
 print("=== ProjVision Video Generator ===")
 
+render_start = time.monotonic()
+
 # =========================
 # PATHS
 # =========================
@@ -20,6 +47,50 @@ audio_folder = "audio"
 narration_file = "data/narration.txt"
 output_video = "final_video.mp4"
 
+# moviepy writes video only; the soundtrack is muxed in afterwards
+temp_video = "temp_video.mp4"
+
+# Sidecar tracks served to the frontend player next to the video
+output_srt = "final_video.srt"
+output_vtt = "final_video.vtt"
+
+# still: one pre-composited frame per scene encoded straight by ffmpeg
+# moviepy: per-frame compositing in Python (previous behaviour)
+RENDER_MODE = os.environ.get("RENDER_MODE", "still")
+
+# burn: subtitles drawn into the frames (previous behaviour)
+# soft: timed text track in the mp4 plus SRT/WebVTT sidecars, no overlay
+# both: burned in and also available as a track
+SUBTITLE_MODE = os.environ.get("SUBTITLE_MODE", "burn")
+
+BURN_SUBTITLES = SUBTITLE_MODE in ("burn", "both")
+SOFT_SUBTITLES = SUBTITLE_MODE in ("soft", "both")
+
+# Publish each finished scene to an HLS playlist while later ones encode.
+# Off by default: it costs a remux and an AAC encode per scene, so only
+# web jobs (run_pipeline --stream) where someone is watching turn it on
+STREAM_OUTPUT = os.environ.get("STREAM_OUTPUT", "0") == "1"
+
+# Scenes encoded at once, and x264 threads each, so together they fill the cores
+CPU_COUNT = os.cpu_count() or 1
+SCENE_WORKERS = max(1, int(os.environ.get("VIDEO_WORKERS", str(CPU_COUNT))))
+ENCODE_THREADS = max(1, CPU_COUNT // SCENE_WORKERS)
+
+output_size = get_output_size()
+profile = get_profile()
+
+# One line per render, to compare encode time and size across profiles
+ENCODE_LOG = "data/encode_log.jsonl"
+
+print(
+    f"Render profile: {get_profile_name()} {output_size[0]}x{output_size[1]} "
+    f"preset={profile['preset']} crf={profile['crf']}"
+)
+
+# Subtitle strip sits 140 px above the bottom edge at 720p (y = 580)
+subtitle_y = output_size[1] - scaled(140, output_size)
+subtitle_height = scaled(110, output_size)
+
 # =========================
 # DELETE OLD VIDEO
 # =========================
@@ -28,6 +99,10 @@ if os.path.exists(output_video):
     os.remove(output_video)
     print("Old video deleted")
 
+for sidecar in (output_srt, output_vtt):
+    if os.path.exists(sidecar):
+        os.remove(sidecar)
+
 # =========================
 # SORT FUNCTION
 # =========================
@@ -59,6 +134,81 @@ audio_files = sorted(
 print("Images Found:", len(image_files))
 print("Audio Found:", len(audio_files))
 
+# =========================
+# AUDIO MANIFEST
+# =========================
+
+def load_audio_manifest():
+
+    path = os.path.join(audio_folder, "manifest.json")
+
+    if not os.path.exists(path):
+        print("No audio manifest, durations will be probed")
+        return {}
+
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    return {scene["file"]: scene for scene in manifest["scenes"]}
+
+audio_manifest = load_audio_manifest()
+
+# =========================
+# PLAN TIMELINE
+# =========================
+
+IMAGE_ONLY_DURATION = 3
+
+def audio_duration(audio_file):
+
+    scene = audio_manifest.get(audio_file)
+
+    if scene is not None:
+        return scene["duration"]
+
+    # Fallback for audio produced without a manifest
+    probe = AudioFileClip(os.path.join(audio_folder, audio_file))
+    duration = probe.duration
+    probe.close()
+
+    return duration
+
+def audio_words(audio_file):
+
+    scene = audio_manifest.get(audio_file)
+
+    return scene.get("words", []) if scene is not None else []
+
+timeline = []
+frame = 0
+
+for i, img in enumerate(image_files):
+
+    aud = audio_files[i] if i < len(audio_files) else None
+    duration = audio_duration(aud) if aud else IMAGE_ONLY_DURATION
+
+    # Each scene is rounded to whole frames on its own, so its length (and
+    # its cached segment) does not depend on the scenes before it; audio is
+    # laid on the same grid, so the rounding never drifts against video.
+    # start is where the scene actually plays, for subtitle cue timing
+    frames = max(1, round(duration * FPS))
+
+    timeline.append({
+        "image": img,
+        "audio": aud,
+        "start": frame / FPS,
+        "duration": duration,
+        "first_frame": frame,
+        "frames": frames,
+        "words": audio_words(aud) if aud else []
+    })
+
+    frame += frames
+
+total_duration = frame / FPS
+
+print(f"Planned timeline: {len(timeline)} scenes, {total_duration:.1f}s")
+
 # =========================
 # LOAD CLEAN SUBTITLES
 # =========================
@@ -93,16 +243,22 @@ print("Subtitles Loaded:", len(subtitles))
 # FONT (REDUCED SIZE)
 # =========================
 
-font = ImageFont.truetype("C:/Windows/Fonts/arial.ttf", 18)
+font_size = scaled(18, output_size)
+
+print("Subtitle font:", find_font() or "built-in", font_size)
+
+# Rendered strips kept per (text, font, size, width, height)
+SUBTITLE_CACHE_SIZE = 256
 
 # =========================
 # CREATE SUBTITLE IMAGE
 # =========================
 
-def create_subtitle(text):
+@lru_cache(maxsize=SUBTITLE_CACHE_SIZE)
+def render_subtitle(text, font_path, size, width, height):
 
-    width = 1280
-    height = 110
+    # font_path is part of the cache key; load_font resolves the same file
+    font = load_font(size)
 
     text = "\n".join(textwrap.wrap(text, width=60))
 
@@ -127,96 +283,213 @@ def create_subtitle(text):
         align="center"
     )
 
-    return np.array(img)
+    return img
+
+def create_subtitle(text):
+
+    # Shared image: callers composite from it but never draw on it
+    return render_subtitle(text, find_font(), font_size, output_size[0], subtitle_height)
+
+# =========================
+# MOVIEPY PATH
+# =========================
+
+def load_scene_frame(i):
+
+    scene = timeline[i]
+
+    print("\nProcessing:", scene["image"])
+
+    text = subtitles[i] if i < len(subtitles) else ""
+
+    # Full-size source images are decoded, shrunk and composited here,
+    # then only the output-size frame is kept while the scene renders
+    frame = composite_still(
+        os.path.join(images_folder, scene["image"]),
+        create_subtitle(text) if BURN_SUBTITLES else None,
+        subtitle_y,
+        output_size
+    )
+
+    return np.asarray(frame)
+
+def render_moviepy(audio_track):
+
+    # One scene in memory at a time, however long the video is
+    scenes = LazySceneTimeline(timeline, FPS, load_scene_frame)
+
+    final_video = scenes.clip()
+
+    # EXPORT VIDEO
+    print("\nRendering video...")
+
+    final_video.write_videofile(
+        temp_video,
+        fps=FPS,
+        codec="libx264",
+        preset=profile["preset"],
+        ffmpeg_params=["-crf", str(profile["crf"])],
+        audio=False
+    )
+
+    scenes.close()
+
+    print(f"Loaded {scenes.loads} scene frames for {len(timeline)} scenes")
+
+    print("\nAdding audio...")
+
+    mux_audio(["-i", temp_video], audio_track, output_video, profile)
+
+    os.remove(temp_video)
 
 # =========================
-# CREATE VIDEO CLIPS
+# STILL-FRAME PATH
 # =========================
 
-clips = []
+def render_scene(i, scene, cache):
 
-total_images = len(image_files)
-total_audio = len(audio_files)
+    text = subtitles[i] if i < len(subtitles) and BURN_SUBTITLES else ""
 
-for i in range(total_images):
+    image_path = os.path.join(images_folder, scene["image"])
+    frame_path = os.path.join(SEGMENT_FOLDER, f"frame_{i}.png")
+    segment_path = os.path.join(SEGMENT_FOLDER, f"segment_{i}.mp4")
 
-    img = image_files[i]
-    image_path = os.path.join(images_folder,img)
+    # Unchanged image, narration, subtitle and profile: reuse the encode
+    key = cache.key_for(
+        image_path, text, scene["frames"],
+        profile, output_size, ENCODER_VERSION
+    )
+
+    if cache.fetch(key, segment_path):
+        print(f"Reused segment for {scene['image']}")
+        return segment_path
+
+    started = time.monotonic()
+
+    frame_path = compose_frame(
+        image_path,
+        create_subtitle(text) if BURN_SUBTITLES else None,
+        subtitle_y,
+        output_size,
+        frame_path
+    )
+
+    encode_still_segment(frame_path, scene["frames"], segment_path, profile, ENCODE_THREADS)
 
-    print("\nProcessing:", img)
+    cache.store(key, segment_path)
 
-    # IMAGE + AUDIO
-    if i < total_audio:
+    print(f"Encoded {scene['image']} ({scene['duration']:.1f}s) in {time.monotonic() - started:.2f}s")
 
-        aud = audio_files[i]
-        audio_path = os.path.join(audio_folder,aud)
+    return segment_path
 
-        print("Combining:", img, "+", aud)
 
-        audio_clip = AudioFileClip(audio_path)
+def render_stills(audio_track):
 
-        image_clip = ImageClip(image_path)
-        image_clip = image_clip.set_duration(audio_clip.duration)
-        image_clip = image_clip.resize((1280,720))
-        image_clip = image_clip.set_audio(audio_clip)
+    os.makedirs(SEGMENT_FOLDER, exist_ok=True)
 
-        text = subtitles[i] if i < len(subtitles) else ""
+    for file in os.listdir(SEGMENT_FOLDER):
+        os.remove(os.path.join(SEGMENT_FOLDER, file))
 
-        subtitle_img = create_subtitle(text)
+    cache = SegmentCache()
 
-        subtitle_clip = ImageClip(subtitle_img)
-        subtitle_clip = subtitle_clip.set_duration(audio_clip.duration)
-        subtitle_clip = subtitle_clip.set_position(("center",580))
+    playlist = None
 
-        final_clip = CompositeVideoClip([image_clip, subtitle_clip])
-        final_clip = final_clip.set_audio(audio_clip)
+    if STREAM_OUTPUT:
+        playlist = HlsPlaylist(STREAM_FOLDER, [scene["frames"] / FPS for scene in timeline], profile)
 
-    # IMAGE ONLY
-    else:
+    print(f"Encoding {len(timeline)} scenes on {SCENE_WORKERS} workers")
 
-        print("Adding image without audio:", img)
+    segments = []
 
-        duration = 3
+    # Each scene is its own ffmpeg process, so threads keep every core busy
+    with ThreadPoolExecutor(max_workers=SCENE_WORKERS) as pool:
 
-        image_clip = ImageClip(image_path)
-        image_clip = image_clip.set_duration(duration)
-        image_clip = image_clip.resize((1280,720))
+        futures = [
+            pool.submit(render_scene, i, scene, cache)
+            for i, scene in enumerate(timeline)
+        ]
 
-        text = subtitles[i] if i < len(subtitles) else ""
+        # Waiting in scene order lets the playlist grow without gaps
+        for i, future in enumerate(futures):
 
-        subtitle_img = create_subtitle(text)
+            segments.append(future.result())
 
-        subtitle_clip = ImageClip(subtitle_img)
-        subtitle_clip = subtitle_clip.set_duration(duration)
-        subtitle_clip = subtitle_clip.set_position(("center",580))
+            if playlist is not None:
+                scene = timeline[i]
+                playlist.publish(
+                    i, segments[-1],
+                    scene["first_frame"] / FPS, scene["frames"] / FPS,
+                    timeline_slice(audio_track, scene["first_frame"], scene["frames"], FPS)
+                )
 
-        final_clip = CompositeVideoClip([image_clip, subtitle_clip])
+    if playlist is not None:
+        playlist.finish()
 
-    clips.append(final_clip)
+    print("\nJoining segments...")
+
+    concat_segments(segments, output_video, audio_track, profile)
+
+    cache.log_stats()
 
 # =========================
-# MERGE VIDEO
+# RENDER
 # =========================
 
-print("\nMerging clips...")
+print("Render mode:", RENDER_MODE, "| subtitles:", SUBTITLE_MODE)
+
+encode_start = time.monotonic()
 
-final_video = concatenate_videoclips(clips, method="compose")
+# Every narration file decoded once into a single PCM track, AAC encoded once
+audio_track = build_audio_timeline(timeline, audio_folder, FPS)
+
+print(f"Audio timeline took {time.monotonic() - encode_start:.2f}s")
+
+if RENDER_MODE == "moviepy":
+    render_moviepy(audio_track)
+else:
+    render_stills(audio_track)
 
 # =========================
-# EXPORT VIDEO
+# SOFT SUBTITLES
 # =========================
 
-print("\nRendering video with audio...")
+if SOFT_SUBTITLES:
 
-final_video.write_videofile(
-    output_video,
-    fps=24,
-    codec="libx264",
-    audio_codec="libmp3lame",
-    audio_bitrate="192k",
-    temp_audiofile="temp_audio.mp3",
-    remove_temp=True
-)
+    cues = build_cues(timeline, subtitles)
+
+    write_subtitle_files(cues, output_srt, output_vtt)
+
+    if cues:
+        add_subtitle_track(output_video, output_srt)
+
+encode_seconds = time.monotonic() - encode_start
+output_bytes = os.path.getsize(output_video)
+
+print(f"Encode took {encode_seconds:.2f}s, output {output_bytes / (1024 * 1024):.1f} MB")
+
+# =========================
+# RECORD ENCODE STATS
+# =========================
+
+os.makedirs(os.path.dirname(ENCODE_LOG), exist_ok=True)
+
+with open(ENCODE_LOG, "a", encoding="utf-8") as f:
+    f.write(json.dumps({
+        "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "profile": get_profile_name(),
+        "mode": RENDER_MODE,
+        "subtitles": SUBTITLE_MODE,
+        "size": f"{output_size[0]}x{output_size[1]}",
+        "video_seconds": round(total_duration, 2),
+        "encode_seconds": round(encode_seconds, 2),
+        "bytes": output_bytes
+    }) + "\n")
+
+subtitle_stats = render_subtitle.cache_info()
+
+print(f"Subtitle strips: {subtitle_stats.misses} rendered, {subtitle_stats.hits} reused")
+
+log_resource_usage("Render usage", render_start)
 
 print("\nSUCCESS!")
 print("Video saved as:", output_video)
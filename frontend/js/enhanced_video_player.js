@@ -55,4 +55,52 @@ if(videoPlayer){
 
     });
 
-}
\ No newline at end of file
+}
+
+
+// Play an HLS playlist that keeps growing while later scenes render
+// Returns the hls.js instance (null for native playback) so callers can
+// stop loading if the job fails before the playlist is finished
+function loadStream(player, url){
+
+    // Safari plays HLS natively
+    if(player.canPlayType("application/vnd.apple.mpegurl")){
+
+        player.src = url;
+        return null;
+
+    }
+
+    if(window.Hls && Hls.isSupported()){
+
+        const hls = new Hls();
+
+        hls.loadSource(url);
+        hls.attachMedia(player);
+
+        hls.on(Hls.Events.ERROR, function(event, data){
+
+            console.error("Stream error:", data.details);
+
+            if(!data.fatal){
+                return;
+            }
+
+            if(data.type === Hls.ErrorTypes.MEDIA_ERROR){
+                hls.recoverMediaError();
+            }
+            else{
+                hls.startLoad();
+            }
+
+        });
+
+        return hls;
+
+    }
+
+    console.error("HLS playback not supported in this browser");
+
+    return null;
+
+}
@@ -32,6 +32,24 @@ async function checkStatus(){
             localStorage.setItem("video_url", API + data.video);
             localStorage.setItem("doc_url", API + data.doc);
 
+            if(data.subtitles){
+                localStorage.setItem("subtitles_url", API + data.subtitles);
+            }
+            else{
+                localStorage.removeItem("subtitles_url");
+            }
+
+            localStorage.removeItem("stream_url");
+
+            window.location.href = "result.html";
+            return;
+        }
+
+        // First scenes are playable, the rest keep rendering
+        if(data.stream){
+
+            localStorage.setItem("stream_url", API + data.stream);
+
             window.location.href = "result.html";
             return;
         }
@@ -1,7 +1,10 @@
 import os
 
-# Force FFmpeg
-os.environ["IMAGEIO_FFMPEG_EXE"] = r"C:\ffmpeg-8.0.1-essentials_build\bin\ffmpeg.exe"
+# Use the local Windows build when present, otherwise moviepy's own ffmpeg
+WINDOWS_FFMPEG = r"C:\ffmpeg-8.0.1-essentials_build\bin\ffmpeg.exe"
+
+if os.path.exists(WINDOWS_FFMPEG):
+    os.environ["IMAGEIO_FFMPEG_EXE"] = WINDOWS_FFMPEG
 
 from moviepy.editor import *
 